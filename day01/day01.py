@@ -1,14 +1,19 @@
 """Day 01."""
 
-from collections import Counter
-from typing import Any, Iterator, TextIO
+from typing import Any, Iterator
 
-from utils.parse import read_number_columns
+import numpy as np
 
+from utils.buffer import InputBuffer
 
-def run(file: TextIO) -> Iterator[Any]:
+INPUT_BUFFER = True
+
+
+def run(buffer: InputBuffer) -> Iterator[Any]:
     """Solution for Day 01."""
-    nums1, nums2 = read_number_columns(file)
-    yield sum(abs(num1 - num2) for num1, num2 in zip(sorted(nums1), sorted(nums2)))
-    num2_counts = Counter(nums2)
-    yield sum(num * num2_counts[num] for num in nums1)
+    nums1, nums2 = buffer.int_columns(2).T
+    yield int(np.abs(np.sort(nums1) - np.sort(nums2)).sum())
+    values, counts = np.unique(nums2, return_counts=True)
+    idx = np.searchsorted(values, nums1).clip(max=len(values) - 1)
+    matches = values[idx] == nums1
+    yield int((nums1[matches] * counts[idx[matches]]).sum())
@@ -3,7 +3,7 @@
 from itertools import pairwise
 from typing import Any, Iterator, TextIO
 
-from utils.parse import read_number_list
+from utils.parse import iter_number_list
 
 
 def is_safe(levels: list[int], increasing: bool) -> int | None:
@@ -44,6 +44,10 @@ def is_safe_p2(levels: list[int]) -> bool:
 
 def run(file: TextIO) -> Iterator[Any]:
     """Solution for Day 02."""
-    reports = read_number_list(file)
-    yield sum(is_safe_p1(list(report)) for report in reports)
-    yield sum(is_safe_p2(list(report)) for report in reports)
+    safe_p1 = 0
+    safe_p2 = 0
+    for report in iter_number_list(file):
+        safe_p1 += is_safe_p1(list(report))
+        safe_p2 += is_safe_p2(list(report))
+    yield safe_p1
+    yield safe_p2
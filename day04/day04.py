@@ -4,59 +4,36 @@ from __future__ import annotations
 from collections import Counter
 from typing import Any, Iterator, TextIO
 
-from utils.geometry import (
-    CORNERS,
-    DIRECTIONS,
-    DOWN_LEFT,
-    UP_RIGHT,
-    Point2D,
-    get_grid_point,
-    iter_grid,
-)
+from utils.geometry import DOWN_LEFT, UP_RIGHT, Grid
 from utils.parse import read_lines
 
 
-def is_word(
-    grid: list[list[str]],
-    word: list[str],
-    position: Point2D,
-    direction: Point2D,
-) -> bool:
-    match word:
-        case []:
-            return True
-        case [letter, *rest] if get_grid_point(grid, position) == letter:
-            return is_word(
-                grid,
-                rest,
-                position + direction,
-                direction,
-            )
-        case _:
-            return False
+def is_word(grid: Grid, word: str, idx: int, offset: int) -> bool:
+    return all(grid[idx + i * offset] == letter for i, letter in enumerate(word))
 
 
-def count_words(grid: list[list[str]], word: list[str]) -> int:
+def count_words(grid: Grid, word: str) -> int:
     count = 0
-    for _, position in iter_grid(grid):
-        for direction in DIRECTIONS:
-            if is_word(grid, word, position, direction):
+    for val, idx in grid.iter_cells():
+        if val != word[0]:
+            continue
+        for offset in grid.directions:
+            if is_word(grid, word, idx, offset):
                 count += 1
     return count
 
 
-def part2(grid: list[list[str]]) -> int:
+def part2(grid: Grid) -> int:
     count = 0
     expected_corners = Counter("MMSS")
-    for val, position in iter_grid(grid):
+    up_right = grid.offset(UP_RIGHT)
+    down_left = grid.offset(DOWN_LEFT)
+    for val, idx in grid.iter_cells():
         if val == "A":
-            corners = {
-                direction: get_grid_point(grid, position + direction)
-                for direction in CORNERS
-            }
+            corners = {offset: grid[idx + offset] for offset in grid.corners}
             if (
                 Counter(corners.values()) == expected_corners
-                and corners[UP_RIGHT] != corners[DOWN_LEFT]
+                and corners[up_right] != corners[down_left]
             ):
                 count += 1
     return count
@@ -64,7 +41,8 @@ def part2(grid: list[list[str]]) -> int:
 
 def run(file: TextIO) -> Iterator[Any]:
     """Solution for Day 04."""
-    grid = [list(line) for line in read_lines(file)]
+    word = "XMAS"
+    grid = Grid(read_lines(file), padding=len(word) - 1)
 
-    yield count_words(grid, list("XMAS"))
+    yield count_words(grid, word)
     yield part2(grid)
@@ -1,56 +1,147 @@
 """Day 06."""
 
+from concurrent.futures import ProcessPoolExecutor
 from typing import Any, Iterator, TextIO
 
-from utils.geometry import DOWN, LEFT, RIGHT, UP, Point2D, get_grid_point, iter_grid
+from utils.geometry import DOWN, LEFT, RIGHT, UP, Grid
 from utils.parse import read_lines
+from utils.shared_grid import SharedGrid, SharedGridHandle
 
-NEXT_DIRECTION = {UP: RIGHT, RIGHT: DOWN, DOWN: LEFT, LEFT: UP}
+# Directions in the order the guard turns through them
+TURN_ORDER = [UP, RIGHT, DOWN, LEFT]
+OBSTACLE = ord("#")
 
+# Candidate obstacles paired with the state to restart the guard from
+Candidate = tuple[int, tuple[int, int]]
 
-def follow_route(
-    grid: list[list[str]],
-    position: Point2D,
-    direction: Point2D,
-    extra_obstacle: Point2D | None = None,
-) -> set[tuple[Point2D, Point2D]] | None:
-    visited = {(position, direction)}
+
+def build_jumps(grid: Grid, offsets: list[int]) -> list[list[int]]:
+    """For every cell and direction, find the last cell before an obstacle or the edge."""
+    jumps = []
+    cells = grid.cells
+    for offset in offsets:
+        jump = [-1] * len(cells)
+        # Walk against the direction so the cell ahead is always filled in first
+        order = range(len(cells) - 1, -1, -1) if offset > 0 else range(len(cells))
+        for idx in order:
+            if cells[idx] == OBSTACLE or cells[idx] == grid.border:
+                continue
+            ahead = idx + offset
+            if cells[ahead] == OBSTACLE or cells[ahead] == grid.border:
+                jump[idx] = idx
+            else:
+                jump[idx] = jump[ahead]
+        jumps.append(jump)
+    return jumps
+
+
+def walk_route(
+    grid: Grid, position: int, offsets: list[int]
+) -> dict[int, tuple[int, int]]:
+    """Walk the guard's route, recording the state just before each cell is first entered."""
+    direction = 0
+    first_entries = {position: (position, direction)}
+    turns = set()
+    while True:
+        new_position = position + offsets[direction]
+        cell = grid.cells[new_position]
+        if cell == OBSTACLE:
+            turn = position * 4 + direction
+            assert turn not in turns, "The guard never leaves"
+            turns.add(turn)
+            direction = (direction + 1) % 4
+        elif cell == grid.border:
+            return first_entries
+        else:
+            if new_position not in first_entries:
+                first_entries[new_position] = (position, direction)
+            position = new_position
+
+
+def creates_loop(
+    grid: Grid,
+    jumps: list[list[int]],
+    offsets: list[int],
+    position: int,
+    direction: int,
+    extra_obstacle: int,
+) -> bool:
+    """Follow the guard from turn to turn and check whether it ends up in a loop."""
+    turns = set()
     while True:
-        new_position = position + direction
-        if new_position == extra_obstacle:
-            direction = NEXT_DIRECTION[direction]
-            continue
-        match get_grid_point(grid, new_position):
-            case "." | "^":
-                if (new_position, direction) in visited:
-                    return None
-                position = new_position
-                visited.add((position, direction))
-            case "#":
-                direction = NEXT_DIRECTION[direction]
-            case _:
-                return visited
-
-
-def run(file: TextIO) -> Iterator[Any]:
+        offset = offsets[direction]
+        stop = jumps[direction][position]
+        steps, remainder = divmod(extra_obstacle - position, offset)
+        if remainder == 0 and 0 < steps <= (stop - position) // offset:
+            stop = extra_obstacle - offset
+        elif grid.cells[stop + offset] == grid.border:
+            return False
+
+        turn = stop * 4 + direction
+        if turn in turns:
+            return True
+        turns.add(turn)
+        position = stop
+        direction = (direction + 1) % 4
+
+
+def count_loops(
+    grid: Grid, jumps: list[list[int]], offsets: list[int], candidates: list[Candidate]
+) -> int:
+    return sum(
+        creates_loop(grid, jumps, offsets, position, direction, obstacle)
+        for obstacle, (position, direction) in candidates
+    )
+
+
+# Each worker attaches to the shared grid and builds its own jump table once,
+# when the pool starts, so nothing grid sized is pickled
+_worker_state: tuple[Grid, list[list[int]], list[int]] | None = None
+
+
+def init_worker(handle: SharedGridHandle) -> None:
+    global _worker_state
+    grid = SharedGrid.attach(handle)
+    offsets = [grid.offset(direction) for direction in TURN_ORDER]
+    _worker_state = (grid, build_jumps(grid, offsets), offsets)
+
+
+def count_loops_in_worker(candidates: list[Candidate]) -> int:
+    assert _worker_state is not None
+    return count_loops(*_worker_state, candidates)
+
+
+def count_loops_parallel(grid: Grid, candidates: list[Candidate], workers: int) -> int:
+    chunk_count = workers * 4
+    chunks = [candidates[i::chunk_count] for i in range(chunk_count)]
+    shared_grid = SharedGrid.create(grid)
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=init_worker,
+            initargs=(shared_grid.handle,),
+        ) as executor:
+            return sum(executor.map(count_loops_in_worker, chunks))
+    finally:
+        shared_grid.unlink()
+
+
+def run(file: TextIO, workers: int = 1) -> Iterator[Any]:
     """Solution for Day 06."""
-    grid = [list(line) for line in read_lines(file)]
-    for val, pos in iter_grid(grid):
-        if val == "^":
-            current_position = pos
-            break
-
-    main_route = follow_route(grid, current_position, UP)
-    assert main_route is not None
-    visited_spaces = {pos for pos, _ in main_route}
-
-    yield len(visited_spaces)
-
-    possible_loops = 0
-    for pos in visited_spaces:
-        if (
-            get_grid_point(grid, pos) != "^"
-            and follow_route(grid, current_position, UP, pos) is None
-        ):
-            possible_loops += 1
-    yield possible_loops
+    grid = Grid(read_lines(file))
+    start = grid.find("^")
+    offsets = [grid.offset(direction) for direction in TURN_ORDER]
+
+    first_entries = walk_route(grid, start, offsets)
+    yield len(first_entries)
+
+    # The route up to an obstacle's first visit is unchanged, so start from there
+    candidates = [
+        (obstacle, state)
+        for obstacle, state in first_entries.items()
+        if obstacle != start
+    ]
+    if workers > 1:
+        yield count_loops_parallel(grid, candidates, workers)
+    else:
+        yield count_loops(grid, build_jumps(grid, offsets), offsets, candidates)
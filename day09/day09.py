@@ -1,15 +1,13 @@
 """Day 09."""
+from __future__ import annotations
 
-from dataclasses import dataclass
+from array import array
+from heapq import heappop, heappush
 from typing import Any, Iterator, TextIO
 
 from utils.parse import read_lines
 
-
-@dataclass
-class File:
-    size: int
-    file_id: int
+MAX_SIZE = 9
 
 
 def checksum(offset: int, file_id: int, size: int) -> int:
@@ -17,84 +15,72 @@ def checksum(offset: int, file_id: int, size: int) -> int:
     return file_id * offset_sum
 
 
-def part_1(files: list[File | int]) -> int:
-    l_iter = enumerate(files)
-    r_iter = reversed(list(enumerate(files)))
-
-    l_idx, l_file = next(l_iter)
-    r_idx, r_file = next(r_iter)
-
-    results = []
-
-    while l_idx <= r_idx:
-        match (l_file, r_file):
-            case (File(), _):
-                results.append(l_file)
-                l_idx, l_file = next(l_iter)
-            case (_, int()):
-                r_idx, r_file = next(r_iter)
-            case (0, _):
-                l_idx, l_file = next(l_iter)
-            case (_, File(size=0)):
-                r_idx, r_file = next(r_iter)
-            case (int(), File()):
-                if l_file >= r_file.size:
-                    results.append(r_file)
-                    l_file -= r_file.size
-                    r_idx, r_file = next(r_iter)
-                else:
-                    results.append(File(size=l_file, file_id=r_file.file_id))
-                    r_file.size -= l_file
-                    l_idx, l_file = next(l_iter)
-
+# Even indices of the disk map are file sizes and odd indices are gap sizes, so
+# the file id of any even index is just index // 2
+def part_1(disk: array[int]) -> int:
+    left = 0
+    right = len(disk) - 1 - (len(disk) - 1) % 2
+    right_remaining = disk[right]
     offset = 0
     total_checksum = 0
-    for result in results:
-        total_checksum += checksum(offset, result.file_id, result.size)
-        offset += result.size
+
+    while left < right:
+        if left % 2 == 0:
+            total_checksum += checksum(offset, left // 2, disk[left])
+            offset += disk[left]
+        else:
+            gap = disk[left]
+            while gap > 0 and left < right:
+                moved = min(gap, right_remaining)
+                total_checksum += checksum(offset, right // 2, moved)
+                offset += moved
+                gap -= moved
+                right_remaining -= moved
+                if right_remaining == 0:
+                    right -= 2
+                    right_remaining = disk[right]
+        left += 1
+
+    # Whatever is left of a partially moved file stays where it is
+    if left == right:
+        total_checksum += checksum(offset, right // 2, right_remaining)
     return total_checksum
 
 
-def part_2(files_and_gaps: list[File | int]) -> int:
-    gaps = []
+def part_2(disk: array[int]) -> int:
+    # One min-heap of offsets per gap size; offsets are read in increasing order,
+    # so each list starts out as a valid heap
+    gaps: list[list[int]] = [[] for _ in range(MAX_SIZE + 1)]
     files = []
     offset = 0
-    for f in files_and_gaps:
-        if isinstance(f, File):
-            files.append((f, offset))
-            offset += f.size
-        else:
-            gaps.append((f, offset))
-            offset += f
+    for i, size in enumerate(disk):
+        if i % 2 == 0:
+            files.append((i // 2, size, offset))
+        elif size > 0:
+            gaps[size].append(offset)
+        offset += size
 
     total_checksum = 0
-    for file, file_offset in reversed(files):
-        for i, (gap, gap_offset) in enumerate(gaps):
-            if gap_offset > file_offset:
-                total_checksum += checksum(file_offset, file.file_id, file.size)
-                break
-            if gap >= file.size:
-                if gap == file.size:
-                    gaps.pop(i)
-                else:
-                    gaps[i] = (gap - file.size, gap_offset + file.size)
-                total_checksum += checksum(gap_offset, file.file_id, file.size)
-                break
-        else:
-            total_checksum += checksum(file_offset, file.file_id, file.size)
+    for file_id, size, file_offset in reversed(files):
+        # The leftmost gap that fits is the smallest top of the heaps big enough
+        best_size = 0
+        best_offset = file_offset
+        for gap_size in range(size, MAX_SIZE + 1):
+            heap = gaps[gap_size]
+            if heap and heap[0] < best_offset:
+                best_size = gap_size
+                best_offset = heap[0]
+        if best_size > 0:
+            heappop(gaps[best_size])
+            if best_size > size:
+                heappush(gaps[best_size - size], best_offset + size)
+        total_checksum += checksum(best_offset, file_id, size)
 
     return total_checksum
 
 
 def run(file: TextIO) -> Iterator[Any]:
     """Solution for Day 09."""
-    file.seek(0)
-    files: list[File | int] = [
-        File(int(c), i // 2) if i % 2 == 0 else int(c)
-        for i, c in enumerate(next(read_lines(file)))
-    ]
-
-    p2 = part_2(files)
-    p1 = part_1(files)
-    yield p1
-    yield p2
+    disk = array("B", [int(c) for c in next(read_lines(file))])
+    yield part_1(disk)
+    yield part_2(disk)
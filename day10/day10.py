@@ -1,34 +1,38 @@
 """Day 10."""
 
-from functools import cache
 from typing import Any, Iterator, TextIO
 
-from utils.geometry import COMPASS, Point2D, get_grid_point, iter_grid
+from utils.geometry import Grid
 from utils.parse import read_lines
 
+TRAIL_END = ord("9")
 
-@cache
-def get_trailhead_score(grid: tuple[tuple[int]], position: Point2D) -> list[Point2D]:
-    current_height = grid[position.y][position.x]
-    if current_height == 9:
+
+def get_trailhead_score(
+    grid: Grid, position: int, cache: dict[int, list[int]]
+) -> list[int]:
+    if position in cache:
+        return cache[position]
+    current_height = grid.cells[position]
+    if current_height == TRAIL_END:
         return [position]
 
     results = []
-    for direction in COMPASS:
-        new_position = position + direction
-        new_value = get_grid_point(grid, new_position)
-        if new_value is not None and new_value == current_height + 1:
-            results.extend(get_trailhead_score(grid, new_position))
+    for new_position in grid.neighbours(position):
+        if grid.cells[new_position] == current_height + 1:
+            results.extend(get_trailhead_score(grid, new_position, cache))
+    cache[position] = results
     return results
 
 
 def run(file: TextIO) -> Iterator[Any]:
     """Solution for Day 10."""
-    grid = tuple(tuple(int(c) for c in line) for line in read_lines(file))
+    grid = Grid(read_lines(file))
+    cache: dict[int, list[int]] = {}
     trails = [
-        get_trailhead_score(grid, position)
-        for val, position in iter_grid(grid)
-        if val == 0
+        get_trailhead_score(grid, position, cache)
+        for val, position in grid.iter_cells()
+        if val == "0"
     ]
 
     yield sum([len(set(trail)) for trail in trails])
@@ -1,32 +1,61 @@
 """Day 11."""
 
-from functools import cache
-from typing import Any, Iterator, TextIO
+from collections import Counter
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Iterable, Iterator, TextIO
 
 from utils.parse import read_lines
 
+# Stones settle into a few thousand distinct values, so this covers a full run
+MUTATE_CACHE_SIZE = 8192
 
-def mutate(stone: int) -> list[int]:
+
+@lru_cache(maxsize=MUTATE_CACHE_SIZE)
+def mutate(stone: int) -> tuple[int, ...]:
     if stone == 0:
-        return [1]
+        return (1,)
     stone_str = str(stone)
     if len(stone_str) % 2 == 0:
-        return [
+        return (
             int(stone_str[: len(stone_str) // 2]),
             int(stone_str[len(stone_str) // 2 :]),
-        ]
-    return [stone * 2024]
-
-
-@cache
-def blink(stone: int, steps: int) -> int:
-    if steps == 0:
-        return 1
-    return sum(blink(mutation, steps - 1) for mutation in mutate(stone))
+        )
+    return (stone * 2024,)
+
+
+def blink(stones: Iterable[int]) -> Iterator[Counter[int]]:
+    """Blink forever, yielding how many stones have each value after every blink."""
+    counts = Counter(stones)
+    while True:
+        new_counts = Counter[int]()
+        for stone, count in counts.items():
+            for mutation in mutate(stone):
+                new_counts[mutation] += count
+        counts = new_counts
+        yield counts
+
+
+def count_stones(
+    stones: list[int], depths: Iterable[int]
+) -> tuple[dict[int, int], list[int]]:
+    """Count the stones after each of the requested numbers of blinks in one pass.
+
+    Also returns the number of distinct stone values after every blink.
+    """
+    wanted = set(depths)
+    totals = {0: len(stones)} if 0 in wanted else {}
+    distinct = []
+    for step, counts in enumerate(islice(blink(stones), max(wanted)), start=1):
+        distinct.append(len(counts))
+        if step in wanted:
+            totals[step] = sum(counts.values())
+    return totals, distinct
 
 
 def run(file: TextIO) -> Iterator[Any]:
     """Solution for Day 11."""
     stones = [int(c) for c in next(read_lines(file)).split()]
-    yield sum(blink(stone, 25) for stone in stones)
-    yield sum(blink(stone, 75) for stone in stones)
+    totals, _ = count_stones(stones, [25, 75])
+    yield totals[25]
+    yield totals[75]
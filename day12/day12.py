@@ -1,75 +1,70 @@
 """Day 12."""
+from __future__ import annotations
 
-from collections import defaultdict
-from itertools import pairwise
+from array import array
 from typing import Any, Iterator, TextIO
 
-from utils.geometry import COMPASS, LEFT, RIGHT, Point2D, get_grid_point, iter_grid
+from utils.geometry import Grid
 from utils.parse import read_lines
+from utils.union_find import DisjointSets
 
 
-class Region:
-    def __init__(self, char: str) -> None:
-        self.char = char
-        self.points: set[Point2D] = set()
-        self.borders: dict[Point2D, dict[int, list[int]]] = {
-            dir: defaultdict(list) for dir in COMPASS
-        }
+def label_regions(grid: Grid) -> list[tuple[int, int, int]]:
+    """Find the area, perimeter and number of sides of every region in one raster pass.
 
-    @property
-    def area(self) -> int:
-        return len(self.points)
+    Each cell starts as its own region and is merged with matching cells above and to
+    the left, carrying its counts into the surviving root. A region has as many sides
+    as corners, and each corner belongs to exactly one cell.
+    """
+    cells = grid.cells
+    stride = grid.stride
+    # A region's area is the size of its set
+    regions = DisjointSets(len(cells))
+    perimeters = array("i", bytes(4 * len(cells)))
+    corners = array("i", bytes(4 * len(cells)))
 
-    @property
-    def perimeter(self) -> int:
-        return sum(
-            len(borders)
-            for directional_borders in self.borders.values()
-            for borders in directional_borders.values()
+    def union(a: int, b: int) -> None:
+        merged = regions.union(a, b)
+        if merged is not None:
+            root, child = merged
+            perimeters[root] += perimeters[child]
+            corners[root] += corners[child]
+
+    for _, idx in grid.iter_cells():
+        char = cells[idx]
+        up = cells[idx - stride] == char
+        down = cells[idx + stride] == char
+        left = cells[idx - 1] == char
+        right = cells[idx + 1] == char
+
+        perimeters[idx] = 4 - up - down - left - right
+        # Convex corners have both sides open, concave ones only the diagonal
+        corners[idx] = (
+            (not up and not left)
+            + (not up and not right)
+            + (not down and not left)
+            + (not down and not right)
+            + (up and left and cells[idx - stride - 1] != char)
+            + (up and right and cells[idx - stride + 1] != char)
+            + (down and left and cells[idx + stride - 1] != char)
+            + (down and right and cells[idx + stride + 1] != char)
         )
 
-    @property
-    def edges(self) -> int:
-        edge_count = 0
-        for border in self.borders.values():
-            for dimension in border.values():
-                edge_count += 1
-                for offset, next_offset in pairwise(sorted(dimension)):
-                    if next_offset != offset + 1:
-                        edge_count += 1
-        return edge_count
+        if up:
+            union(idx, idx - stride)
+        if left:
+            union(idx, idx - 1)
 
-    def explore(self, grid: list[list[str]], point: Point2D) -> None:
-        stack = [point]
-        while stack:
-            p = stack.pop()
-            if p in self.points:
-                continue
-            self.points.add(p)
-            for direction in COMPASS:
-                n = p + direction
-                if get_grid_point(grid, n) == self.char:
-                    stack.append(n)
-                else:
-                    if direction in {LEFT, RIGHT}:
-                        self.borders[direction][p.x].append(p.y)
-                    else:
-                        self.borders[direction][p.y].append(p.x)
+    return [
+        (regions.sizes[idx], perimeters[idx], corners[idx])
+        for _, idx in grid.iter_cells()
+        if regions.parents[idx] == idx
+    ]
 
 
 def run(file: TextIO) -> Iterator[Any]:
     """Solution for Day 12."""
-    grid = [list(line) for line in read_lines(file)]
-    regions = []
-    region_lookup = {}
-
-    for v, p in iter_grid(grid):
-        if p in region_lookup:
-            continue
-        region = Region(v)
-        region.explore(grid, p)
-        regions.append(region)
-        region_lookup.update({point: region for point in region.points})
+    regions = label_regions(Grid(read_lines(file)))
 
-    yield sum(region.perimeter * region.area for region in regions)
-    yield sum(region.edges * region.area for region in regions)
+    yield sum(area * perimeter for area, perimeter, _ in regions)
+    yield sum(area * sides for area, _, sides in regions)
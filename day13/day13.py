@@ -1,101 +1,128 @@
 """Day 13."""
 
 import re
-from dataclasses import dataclass
 from typing import Any, Iterator, TextIO
 
-from utils.parse import read_sections, regex_groups
+import numpy as np
+import numpy.typing as npt
+
+from utils.parse import iter_sections, regex_groups
 
 # Math time...
 # We have: a * (dx1, dy1) + b (dx2, dy2) = (x, y) where only a and b are unknown.
 # So we can split this into two dimensions:
 # a * dx1 + b * dx2 = x
 # a * dy1 + b * dy2 = y
-# And solve the linear equations
+# And solve the linear equations with Cramer's rule:
+# det = dx1 * dy2 - dx2 * dy1
+# a = (x * dy2 - y * dx2) / det
+# b = (dx1 * y - dy1 * x) / det
+# In order for the solution to be valid, a and b must be non-negative integers
 
-# a * dx1 + b * dx2 = x
-# => a * dx1 = x - b * dx2
-# => a = (x - b * dx2) / dx1
-#
-# a * dy1 + b * dy2 = y
-# => a * dy1 = y - b * dy2
-# => a = (y - b * dy2) / dy1
-#
-# (x - b * dx2) / dx1 = (y - b * dy2) / dy1
-# => dy1 * (x - b * dx2) = dx1 * (y - b * dy2)
-# => dy1 * x - dy1 * b * dx2 = dx1 * y - dx1 * b * dy2
-# => dy1 * x - dx1 * y = dy1 * b * dx2 - dx1 * b * dy2
-# => dy1 * x - dx1 * y = b * (dy1 * dx2 - dx1 * dy2)
-# => b = (dy1 * x - dx1 * y) / (dy1 * dx2 - dx1 * dy2)
-
-# In theory we need to worry about co-linear lines (dx1 * dy2 == dx2 * dy1)
-# which could have multiple solutions but there don't seem to be any instances
-# in the input, meaning "minimizing" coins is irrelevant
+# When the buttons are co-linear (det == 0) there may be many solutions, so reduce
+# to a single dimension and find the cheapest one with the extended gcd
 
 BUTTON_REGEX = re.compile(r"Button (A|B): X\+(\d*), Y\+(\d*)")
 PRIZE_REGEX = re.compile(r"Prize: X=(\d*), Y=(\d*)")
+P2_OFFSET = 10000000000000
+A_COST = 3
+B_COST = 1
 
+# One row per machine: dx1, dy1, dx2, dy2, x, y
+Machines = npt.NDArray[Any]
 
-@dataclass
-class ClawMachine:
-    dx1: int
-    dy1: int
-    dx2: int
-    dy2: int
-    x: int
-    y: int
 
+def extended_gcd(a: int, b: int) -> tuple[int, int, int]:
+    """Find g, s, t such that a * s + b * t == g == gcd(a, b)."""
+    if b == 0:
+        return a, 1, 0
+    g, s, t = extended_gcd(b, a % b)
+    return g, t, s - (a // b) * t
 
-def int_divide_or_none(num: int, denom: int) -> int | None:
-    if num % denom != 0:
-        return None
-    if denom == 0:
-        raise ValueError("Colinear solution")
-    return num // denom
 
+def ceil_div(num: int, denom: int) -> int:
+    return -(-num // denom)
 
-def solve(cm: ClawMachine) -> tuple[int, int] | None:
-    # In order for the solution to be valid, a and b must be integers
-    b = int_divide_or_none(
-        cm.dy1 * cm.x - cm.dx1 * cm.y, cm.dy1 * cm.dx2 - cm.dx1 * cm.dy2
-    )
-    if b is None:
+
+def solve_colinear(
+    dx1: int, dy1: int, dx2: int, dy2: int, x: int, y: int
+) -> tuple[int, int] | None:
+    # The prize has to lie on the shared line
+    if dx1 * y != dy1 * x or dx2 * y != dy2 * x:
         return None
-    a = int_divide_or_none(cm.x - b * cm.dx2, cm.dx1)
-    if a is None:
+    # Both equations now agree, so one dimension is enough
+    p, q, r = (dx1, dx2, x) if dx1 or dx2 else (dy1, dy2, y)
+    if p == 0 and q == 0:
+        return (0, 0) if r == 0 else None
+    if q == 0:
+        return (r // p, 0) if r % p == 0 and r // p >= 0 else None
+    if p == 0:
+        return (0, r // q) if r % q == 0 and r // q >= 0 else None
+
+    # a * p + b * q = r has solutions a0 + k * q', b0 - k * p'
+    g, s, t = extended_gcd(p, q)
+    if r % g != 0:
         return None
-    if a < 0 or b < 0:
+    a0, b0 = s * (r // g), t * (r // g)
+    q_step, p_step = q // g, p // g
+    k_min = ceil_div(-a0, q_step)
+    k_max = b0 // p_step
+    if k_min > k_max:
         return None
-    return a, b
+    # The cost changes linearly with k, so the cheapest solution is at one end
+    k = k_min if A_COST * q_step - B_COST * p_step > 0 else k_max
+    return a0 + k * q_step, b0 - k * p_step
 
 
-def run(file: TextIO) -> Iterator[Any]:
-    """Solution for Day 13."""
-    total_cost = 0
-    total_cost_p2 = 0
-    for button_a, button_b, prize in read_sections(file):
+def solve(machines: Machines) -> Machines:
+    """Find the cost of winning the prize on every machine, or 0 if it can't be won."""
+    dx1, dy1, dx2, dy2, x, y = machines.T
+    det = dx1 * dy2 - dx2 * dy1
+    colinear = det == 0
+    safe_det = np.where(colinear, 1, det)
+    # np.divmod has no object dtype loop, so divide and take the remainder apart
+    a_num = x * dy2 - y * dx2
+    b_num = dx1 * y - dy1 * x
+    a = a_num // safe_det
+    b = b_num // safe_det
+    solved = (
+        ~colinear
+        & (a_num % safe_det == 0)
+        & (b_num % safe_det == 0)
+        & (a >= 0)
+        & (b >= 0)
+    )
+    costs = np.where(solved, A_COST * a + B_COST * b, 0)
+
+    for i in np.flatnonzero(colinear):
+        solution = solve_colinear(*machines[i].tolist())
+        if solution is not None:
+            costs[i] = A_COST * solution[0] + B_COST * solution[1]
+    return costs
+
+
+def parse_machines(file: TextIO) -> list[list[int]]:
+    machines = []
+    for button_a, button_b, prize in iter_sections(file):
         _, dx1, dy1 = regex_groups(BUTTON_REGEX, button_a)
         _, dx2, dy2 = regex_groups(BUTTON_REGEX, button_b)
-        x, y = regex_groupsups(PRIZE_REGEX, prize)
-        claw_machine = ClawMachine(
-            int(dx1), int(dy1), int(dx2), int(dy2), int(x), int(y)
-        )
-        p2_claw_machine = ClawMachine(
-            int(dx1),
-            int(dy1),
-            int(dx2),
-            int(dy2),
-            int(x) + 10000000000000,
-            int(y) + 10000000000000,
-        )
-        solution = solve(claw_machine)
-        if solution is not None:
-            a, b = solution
-            total_cost += 3 * a + b
-        solution2 = solve(p2_claw_machine)
-        if solution2 is not None:
-            a, b = solution2
-            total_cost_p2 += 3 * a + b
-
-    yield total_cost
-    yield total_cost_p2
+        x, y = regex_groups(PRIZE_REGEX, prize)
+        machines.append([int(v) for v in (dx1, dy1, dx2, dy2, x, y)])
+    return machines
+
+
+def run(file: TextIO) -> Iterator[Any]:
+    """Solution for Day 13."""
+    machines = parse_machines(file)
+    p2_machines = [m[:4] + [m[4] + P2_OFFSET, m[5] + P2_OFFSET] for m in machines]
+    all_machines = machines + p2_machines
+
+    # Products are at most a button delta times a prize, twice over, so only fall
+    # back to Python ints when that could overflow
+    largest_delta = max((max(m[:4]) for m in all_machines), default=0)
+    largest_prize = max((max(m[4:]) for m in all_machines), default=0)
+    dtype = np.int64 if 2 * largest_delta * largest_prize < 2**62 else object
+
+    costs = solve(np.array(all_machines, dtype=dtype).reshape(-1, 6))
+    yield int(costs[: len(machines)].sum())
+    yield int(costs[len(machines) :].sum())
@@ -1,73 +1,99 @@
 """Day 14."""
 
-import operator
 import re
-from collections import Counter
-from dataclasses import dataclass
-from functools import reduce
-from itertools import count
+from math import gcd, lcm
 from typing import Any, Iterator, TextIO
 
-from utils.geometry import Point2D
+import numpy as np
+import numpy.typing as npt
+
 from utils.parse import read_lines, regex_groups
 
 ROBOT_REGEX = re.compile(r"p=(-?\d*),(-?\d*) v=(-?\d*),(-?\d*)")
 WIDTH = 101
 HEIGHT = 103
+STEPS = 100
+
+# One row per robot, one column per axis
+Vectors = npt.NDArray[np.int64]
+
+
+def parse_robots(file: TextIO) -> tuple[Vectors, Vectors]:
+    robots = np.array(
+        [
+            [int(v) for v in regex_groups(ROBOT_REGEX, line)]
+            for line in read_lines(file)
+        ],
+        dtype=np.int64,
+    ).reshape(-1, 4)
+    return robots[:, :2], robots[:, 2:]
+
+
+def positions_at(
+    positions: Vectors, velocities: Vectors, time: int, size: Vectors
+) -> Vectors:
+    return (positions + velocities * time) % size
+
 
+def safety_factor(positions: Vectors, width: int, height: int) -> int:
+    x, y = positions.T
+    counted = (x != width // 2) & (y != height // 2)
+    quadrants = (x[counted] > width // 2) * 2 + (y[counted] > height // 2)
+    return int(np.prod(np.bincount(quadrants, minlength=4)))
 
-@dataclass
-class Robot:
-    position: Point2D
-    movement: Point2D
 
-    def move(self) -> None:
-        self.position = Point2D(
-            (self.position.x + self.movement.x) % WIDTH,
-            (self.position.y + self.movement.y) % HEIGHT,
-        )
+def min_variance_time(positions: Vectors, velocities: Vectors, size: int) -> int:
+    """Find the time within one period when the robots are most bunched on one axis."""
+    return min(
+        range(size),
+        key=lambda time: float(((positions + velocities * time) % size).var()),
+    )
 
 
-def print_robots(robots: list[Robot]) -> None:
-    positions = {robot.position for robot in robots}
-    for y in range(HEIGHT):
-        for x in range(WIDTH):
-            if Point2D(x, y) in positions:
-                print("#", end="")
-            else:
-                print(".", end="")
-        print()
+def crt(a: int, m: int, b: int, n: int) -> int | None:
+    """Find the smallest t >= 0 with t = a (mod m) and t = b (mod n), if there is one."""
+    g = gcd(m, n)
+    if (b - a) % g != 0:
+        return None
+    k = (b - a) // g * pow(m // g, -1, n // g) % (n // g)
+    return (a + m * k) % lcm(m, n)
+
+
+# Each axis repeats on its own period, so find when each axis is most clustered and
+# combine them with the Chinese Remainder Theorem
+def find_cluster_time(
+    positions: Vectors, velocities: Vectors, width: int, height: int
+) -> int:
+    x_time = min_variance_time(positions[:, 0], velocities[:, 0], width)
+    y_time = min_variance_time(positions[:, 1], velocities[:, 1], height)
+    time = crt(x_time, width, y_time, height)
+    if time is not None:
+        return time
+    # Sizes that share a factor can give clustered times that never coincide, so
+    # settle for the time clustered on x that is most clustered on y
+    return min(
+        range(x_time, lcm(width, height), width),
+        key=lambda time: float(
+            ((positions[:, 1] + velocities[:, 1] * time) % height).var()
+        ),
+    )
+
+
+def print_robots(positions: Vectors, width: int, height: int) -> None:
+    board = np.full((height, width), ".")
+    board[positions[:, 1], positions[:, 0]] = "#"
+    for row in board:
+        print("".join(row))
     print()
 
 
-def run(file: TextIO) -> Iterator[Any]:
+def run(file: TextIO, width: int = WIDTH, height: int = HEIGHT) -> Iterator[Any]:
     """Solution for Day 14."""
-    quadrants = {(0, 0): 0, (0, 1): 0, (1, 0): 0, (1, 1): 0}
-    robots = []
-    for line in read_lines(file):
-        x, y, dx, dy = regex_groups(ROBOT_REGEX, line)
-        robot = Robot(Point2D(int(x), int(y)), Point2D(int(dx), int(dy)))
-        for _ in range(100):
-            robot.move()
-
-        if robot.position.x == WIDTH // 2 or robot.position.y == HEIGHT // 2:
-            continue
-        robots.append(robot)
-        quadrants[
-            (int(robot.position.x > WIDTH // 2), int(robot.position.y > HEIGHT // 2))
-        ] += 1
-
-    yield reduce(operator.mul, quadrants.values())
-
-    for i in count(start=101):
-        for robot in robots:
-            robot.move()
-
-        # Hacky way to look for a "cluster"
-        # just look for a row and column with a lot of robots
-        rows = Counter(robot.position.y for robot in robots)
-        columns = Counter(robot.position.x for robot in robots)
-        if rows.most_common(1)[0][1] > 20 and columns.most_common(1)[0][1] > 20:
-            print_robots(robots)
-            yield i
-            break
+    positions, velocities = parse_robots(file)
+    size = np.array([width, height])
+
+    yield safety_factor(positions_at(positions, velocities, STEPS, size), width, height)
+
+    time = find_cluster_time(positions, velocities, width, height)
+    print_robots(positions_at(positions, velocities, time, size), width, height)
+    yield time
@@ -1,10 +1,10 @@
 """Day 15."""
 
-from collections import deque
+from itertools import takewhile
 from typing import Any, Iterator, TextIO
 
-from utils.geometry import DOWN, LEFT, RIGHT, UP, Point2D, iter_grid
-from utils.parse import read_sections
+from utils.geometry import DOWN, LEFT, RIGHT, UP, Grid
+from utils.parse import read_lines
 
 DIRECTION_LOOKUP = {
     "<": LEFT,
@@ -12,83 +12,101 @@ DIRECTION_LOOKUP = {
     "^": UP,
     "v": DOWN,
 }
+WIDE_TILES = {"#": "##", "O": "[]", ".": "..", "@": "@."}
+EMPTY = ord(".")
+WALL = ord("#")
+BOX = ord("O")
+BOX_LEFT = ord("[")
+BOX_RIGHT = ord("]")
 
 
-def move_obj(positions: dict[Point2D, str], pos: Point2D, new_pos: Point2D) -> None:
-    positions[new_pos] = positions[pos]
-    positions[pos] = "."
-
-
-def make_move(positions: dict[Point2D, str], pos: Point2D, direction: Point2D) -> bool:
-    search_queue = deque([pos + direction])
-    moved_objects = set()
-    while search_queue:
-        new_pos = search_queue.popleft()
-        new_val = positions[new_pos]
-        match (new_val, direction):
-            case ".", _:
-                continue
-            case ("O", _) | (("[" | "]"), Point2D(_, 0)):
-                moved_objects.add(new_pos)
-                search_queue.append(new_pos + direction)
-            case ("[" | "]", Point2D(0, _)):
-                offset = RIGHT if new_val == "[" else LEFT
-                moved_objects.add(new_pos)
-                moved_objects.add(new_pos + offset)
-                search_queue.append(new_pos + direction)
-                search_queue.append(new_pos + direction + offset)
-            case "#", _:
+def push_line(cells: bytearray, robot: int, offset: int) -> bool:
+    """Push a straight line of boxes one cell along."""
+    end = robot + offset
+    while cells[end] in (BOX, BOX_LEFT, BOX_RIGHT):
+        end += offset
+    if cells[end] != EMPTY:
+        return False
+    if offset == 1:
+        cells[robot + 2 : end + 1] = cells[robot + 1 : end]
+    elif offset == -1:
+        cells[end : robot - 1] = cells[end + 1 : robot]
+    else:
+        # Vertical lines only hold identical boxes, so move the first to the end
+        cells[end] = cells[robot + offset]
+    cells[robot + offset] = EMPTY
+    return True
+
+
+def push_wide(cells: bytearray, robot: int, offset: int) -> bool:
+    """Push wide boxes vertically, one row of the spreading frontier at a time."""
+    layers = []
+    frontier = {robot + offset}
+    while frontier:
+        layer = set()
+        for idx in frontier:
+            tile = cells[idx]
+            if tile == WALL:
                 return False
-            case _:
-                raise ValueError(
-                    f"Unknown object at {new_pos} with direction {direction}: {positions[new_pos]}"
-                )
-    for obj in sorted(
-        moved_objects,
-        key=lambda p: (p.y * direction.y, p.x * direction.x),
-        reverse=True,
-    ):
-        move_obj(positions, obj, obj + direction)
+            if tile == BOX_LEFT:
+                layer.update((idx, idx + 1))
+            elif tile == BOX_RIGHT:
+                layer.update((idx, idx - 1))
+        layers.append(layer)
+        frontier = {idx + offset for idx in layer}
+
+    # Rows further along have already moved out of the way
+    for layer in reversed(layers):
+        for idx in layer:
+            cells[idx + offset] = cells[idx]
+            cells[idx] = EMPTY
     return True
 
 
-def run(file: TextIO) -> Iterator[Any]:
-    """Solution for Day 15."""
-    [starting_grid, moves] = read_sections(file)
-
-    positions = {}
-    positions_p2 = {}
-    robot = None
-    for obj, pos in iter_grid(starting_grid):
-        p2_pos = Point2D(pos.x * 2, pos.y)
-        p2_pos2 = Point2D(pos.x * 2 + 1, pos.y)
-        if obj == "@":
-            robot = pos
-            robot_p2 = p2_pos
-            positions_p2[p2_pos] = "@"
-            positions_p2[p2_pos2] = "."
-        elif obj == "O":
-            positions_p2[p2_pos] = "["
-            positions_p2[p2_pos2] = "]"
+class Warehouse:
+    def __init__(self, grid: Grid, wide: bool) -> None:
+        self.grid = grid
+        self.wide = wide
+        self.robot = grid.find("@")
+        grid[self.robot] = "."
+        self.offsets = {
+            move: grid.offset(direction) for move, direction in DIRECTION_LOOKUP.items()
+        }
+
+    def move(self, move: str) -> None:
+        offset = self.offsets[move]
+        if self.wide and offset not in (-1, 1):
+            moved = push_wide(self.grid.cells, self.robot, offset)
         else:
-            positions_p2[p2_pos] = obj
-            positions_p2[p2_pos2] = obj
+            moved = push_line(self.grid.cells, self.robot, offset)
+        if moved:
+            self.robot += offset
 
-        positions[pos] = obj
-    assert robot is not None
-    assert robot_p2 is not None
+    def gps_sum(self) -> int:
+        box = "[" if self.wide else "O"
+        total = 0
+        for tile, idx in self.grid.iter_cells():
+            if tile == box:
+                point = self.grid.point(idx)
+                total += point.x + 100 * point.y
+        return total
 
-    for move in "".join(moves):
-        direction = DIRECTION_LOOKUP[move]
-        moved = make_move(positions, robot, direction)
-        if moved:
-            move_obj(positions, robot, robot + direction)
-            robot = robot + direction
 
-        moved = make_move(positions_p2, robot_p2, direction)
-        if moved:
-            move_obj(positions_p2, robot_p2, robot_p2 + direction)
-            robot_p2 = robot_p2 + direction
+def run(file: TextIO) -> Iterator[Any]:
+    """Solution for Day 15."""
+    lines = read_lines(file)
+    starting_grid = list(takewhile(lambda line: line, lines))
+    warehouse = Warehouse(Grid(starting_grid), wide=False)
+    warehouse_p2 = Warehouse(
+        Grid("".join(WIDE_TILES[tile] for tile in row) for row in starting_grid),
+        wide=True,
+    )
+
+    # The rest of the file is the moves, which are streamed rather than joined
+    for line in lines:
+        for move in line:
+            warehouse.move(move)
+            warehouse_p2.move(move)
 
-    yield sum(pos.x + 100 * pos.y for pos, obj in positions.items() if obj == "O")
-    yield sum(pos.x + 100 * pos.y for pos, obj in positions_p2.items() if obj == "[")
+    yield warehouse.gps_sum()
+    yield warehouse_p2.gps_sum()
@@ -1,106 +1,55 @@
 """Day 16."""
 
-from collections import defaultdict
-from heapq import heappop, heappush
-from typing import Any, Generic, Iterator, TextIO, TypeVar
+from typing import Any, Iterator, TextIO
 
-from utils.geometry import COMPASS, DOWN, LEFT, RIGHT, UP, Point2D, get_grid_point
+from utils.geometry import DOWN, LEFT, RIGHT, UP, Grid
 from utils.parse import read_lines
+from utils.shortest_path import Move, dijkstra
 
-ROTATION = {
-    RIGHT: [DOWN, UP],
-    LEFT: [UP, DOWN],
-    UP: [RIGHT, LEFT],
-    DOWN: [LEFT, RIGHT],
-}
+# Clockwise, so turning is a step of one heading either way
+HEADINGS = [UP, RIGHT, DOWN, LEFT]
+START_HEADING = HEADINGS.index(RIGHT)
+STEP_COST = 1
+TURN_COST = 1000
+WALL = ord("#")
 
-T = TypeVar("T")
+# A state is cell index * 4 + heading. Moves 0-3 step forward along each heading,
+# moves 4-7 turn, with separate moves for wrapping round between LEFT and UP.
+CLOCKWISE = [4, 4, 4, 5]
+ANTICLOCKWISE = [7, 6, 6, 6]
 
 
-# Because I don't like heapq
-class Heap(Generic[T]):
-    def __init__(self) -> None:
-        self.heap: list[tuple[int, int, T]] = []
-        self.counter = 0
-
-    def push(self, priority: int, item: T) -> None:
-        self.counter += 1
-        heappush(self.heap, (priority, self.counter, item))
-
-    def pop(self) -> tuple[int, T]:
-        priority, _, item = heappop(self.heap)
-        return priority, item
-
-    @property
-    def empty(self) -> bool:
-        return not self.heap
-
-
-def dijkstra(
-    grid: list[list[str]], start: Point2D
-) -> tuple[
-    dict[tuple[Point2D, Point2D], int],
-    dict[tuple[Point2D, Point2D], list[tuple[Point2D | None, Point2D | None]]],
-]:
-    direction = Point2D(1, 0)
-    visited = set()
-    heap = Heap[tuple[Point2D, Point2D, Point2D | None, Point2D | None]]()
-    heap.push(0, (start, direction, None, None))
-    previous = defaultdict(list)
-    distances: dict[tuple[Point2D, Point2D], int] = {}
-
-    while not heap.empty:
-        distance, (node, direction, prev, prev_direction) = heap.pop()
-        if (node, direction) not in distances or distance <= distances[
-            (node, direction)
-        ]:
-            distances[(node, direction)] = distance
-            previous[(node, direction)].append((prev, prev_direction))
-        if (node, direction) in visited:
-            continue
-        visited.add((node, direction))
-        forward = node + direction
-        if get_grid_point(grid, forward) in {".", "E"}:
-            heap.push(distance + 1, (forward, direction, node, direction))
-        for rotation in ROTATION[direction]:
-            heap.push(distance + 1000, (node, rotation, node, direction))
-
-    return distances, previous
-
-
-def print_grid(grid: list[list[str]], tiles: set[Point2D]) -> None:
-    for y, row in enumerate(grid):
-        for x, tile in enumerate(row):
-            if x == 15 and y == 7:
-                print("X", end="")
-            elif Point2D(x, y) in tiles:
-                print("O", end="")
-            else:
-                print(tile, end="")
-        print()
-    print()
+def build_moves(grid: Grid) -> list[Move]:
+    moves = [Move(4 * grid.offset(heading), STEP_COST) for heading in HEADINGS]
+    moves.extend(Move(delta, TURN_COST) for delta in (1, -3, -1, 3))
+    return moves
 
 
 def run(file: TextIO) -> Iterator[Any]:
     """Solution for Day 16."""
-    grid = [list(line) for line in read_lines(file)]
-    start = Point2D(1, len(grid) - 2)
-    end = Point2D(len(grid[0]) - 2, 1)
-    assert get_grid_point(grid, start) == "S"
-    assert get_grid_point(grid, end) == "E"
-
-    distances, paths = dijkstra(grid, start)
-    end_direction = min(COMPASS, key=lambda direction: distances[(end, direction)])
-    yield distances[(end, end_direction)]
-
-    tiles = {start, end}
-    queue = [(end, end_direction)]
-    while queue:
-        node, direction = queue.pop()
-        for prev, prev_direction in paths[(node, direction)]:
-            if prev is None or prev_direction is None or prev == start:
-                continue
-            tiles.add(prev)
-            queue.append((prev, prev_direction))
-
-    yield len(tiles)
+    grid = Grid(read_lines(file))
+    cells = grid.cells
+    start = grid.find("S")
+    end = grid.find("E")
+    moves = build_moves(grid)
+    steps = [grid.offset(heading) for heading in HEADINGS]
+
+    turns = [(CLOCKWISE[h], ANTICLOCKWISE[h]) for h in range(len(HEADINGS))]
+    turns_and_step = [(h, *turn) for h, turn in enumerate(turns)]
+
+    def moves_from(state: int) -> tuple[int, ...]:
+        heading = state & 3
+        if cells[(state >> 2) + steps[heading]] == WALL:
+            return turns[heading]
+        return turns_and_step[heading]
+
+    end_states = [4 * end + heading for heading in range(len(HEADINGS))]
+    paths = dijkstra(
+        4 * len(cells), moves, moves_from, [4 * start + START_HEADING], end_states
+    )
+    best = paths.nearest(end_states)
+    if best is None:
+        raise ValueError("The end can't be reached from the start")
+    yield best
+
+    yield len({state >> 2 for state in paths.on_shortest_paths(end_states)})
@@ -1,16 +1,19 @@
 """Day 17."""
 
 import re
-from enum import Enum
-from typing import Any, Iterator, TextIO
+from enum import IntEnum
+from typing import Any, Callable, Iterator, TextIO
 
 from utils.parse import read_sections, regex_groups
 
 REGISTER_REGEX = re.compile(r"Register \w: (\d*)")
 PROGRAM_REGEX = re.compile(r"Program: ([\d,]*)")
 
+Program = Callable[[int, int, int], list[int]]
+Step = Callable[[int, int, int], int]
 
-class OPCode(Enum):
+
+class OPCode(IntEnum):
     adv = 0
     bxl = 1
     bst = 2
@@ -21,69 +24,128 @@ class OPCode(Enum):
     cdv = 7
 
 
-# Manual work time
-# This program has some nice properties so might not be so bad
-# 2,4 -> BST 4 -> B = (A % 8)
-# 1,5 -> BXL 5 -> B = B ^ 5
-# 7,5 -> CDV 5 -> C = A // 2**B
-# 1,6 -> BXL 6 -> B = B ^ 6
-# 0,3 -> ADV 3 -> A = A // 8
-# 4,6 -> BXC 6 -> B = B ^ C
-# 5,5 -> OUT 5 -> output B
-# 3,0 -> JNZ 0 -> if A != 0: goto 0
-def full_program(A: int) -> list[int]:
-    result = []
-    while A != 0:
-        B = A % 8
-        B ^= 5
-        C = A // 2**B
-        B ^= 6
-        A //= 8
-        B ^= C
-        result.append(B % 8)
-    return result
-
-
-# So we know:
-# - The program will loop until A == 0
-# - A decreases by a factor of 8 each iteration and is otherwise unchanged
-# - A value is output each iteration
-# - The minimum value of A is 8**16, since the output program is 16 characters
-# - B and C are reset each iteration, so we don't have to worry about their leftover values
-# - So for any given "A", we can compute the output of the program for one step
-def run_one(A: int) -> int:
-    B = A % 8
-    B ^= 5
-    C = A // 2**B
-    B ^= 6
-    B ^= C
-    return B % 8
+COMBO_OPERANDS = ["0", "1", "2", "3", "a", "b", "c"]
+
+
+def combo_operand(operand: int) -> str:
+    if operand >= len(COMBO_OPERANDS):
+        raise ValueError(f"Invalid operand {operand}")
+    return COMBO_OPERANDS[operand]
+
+
+# Dividing by 2**x is the same as shifting right by x
+def compile_instruction(opcode: int, operand: int) -> str:
+    match OPCode(opcode):
+        case OPCode.adv:
+            return f"a >>= {combo_operand(operand)}"
+        case OPCode.bxl:
+            return f"b ^= {operand}"
+        case OPCode.bst:
+            return f"b = {combo_operand(operand)} & 7"
+        case OPCode.bxc:
+            return "b ^= c"
+        case OPCode.out:
+            return f"out.append({combo_operand(operand)} & 7)"
+        case OPCode.bdv:
+            return f"b = a >> {combo_operand(operand)}"
+        case OPCode.cdv:
+            return f"c = a >> {combo_operand(operand)}"
+    raise ValueError(f"Can't compile opcode {opcode} in straight-line code")
+
+
+def build_function(name: str, lines: list[str]) -> Callable[..., Any]:
+    source = "\n".join([f"def {name}(a, b, c):", *lines])
+    namespace: dict[str, Any] = {}
+    exec(compile(source, f"<day17 {name}>", "exec"), namespace)
+    return namespace[name]
+
+
+# The program is split into blocks of straight-line code that start at 0, at every
+# jump target and after every jump. Each block becomes one branch of a loop that
+# dispatches on the instruction pointer.
+def compile_program(instructions: list[int]) -> Program:
+    """Turn the instructions into a Python function from (A, B, C) to the output."""
+    size = len(instructions)
+    starts = {0}
+    for pointer in range(0, size - 1, 2):
+        if instructions[pointer] == OPCode.jnz:
+            starts.update((instructions[pointer + 1], pointer + 2))
+
+    lines = ["    out = []", "    pointer = 0", "    while True:"]
+    for start in sorted(start for start in starts if start < size - 1):
+        lines.append(f"        if pointer == {start}:")
+        pointer = start
+        while True:
+            opcode, operand = instructions[pointer : pointer + 2]
+            pointer += 2
+            if opcode == OPCode.jnz:
+                lines.append(f"            pointer = {operand} if a else {pointer}")
+                break
+            lines.append(f"            {compile_instruction(opcode, operand)}")
+            if pointer in starts or pointer >= size - 1:
+                lines.append(f"            pointer = {pointer}")
+                break
+        lines.append("            continue")
+    lines.append("        return out")
+    return build_function("program", lines)
+
+
+def compile_step(instructions: list[int]) -> tuple[Step, int]:
+    """Compile one pass through the loop body, up to its output.
+
+    This only works for the shape of program that every input has: a single loop
+    back to the start, which outputs once and shifts A right by a constant once.
+    Returns the step function along with the shift.
+    """
+    body = list(zip(instructions[:-2:2], instructions[1:-2:2]))
+    opcodes = [opcode for opcode, _ in body]
+    if (
+        instructions[-2:] != [OPCode.jnz, 0]
+        or OPCode.jnz in opcodes
+        or opcodes.count(OPCode.out) != 1
+        or opcodes.count(OPCode.adv) != 1
+    ):
+        raise ValueError("Program is not a single loop with one output and shift")
+    [shift] = [operand for opcode, operand in body if opcode == OPCode.adv]
+    if shift > 3:
+        raise ValueError("Program doesn't shift A by a constant")
+
+    lines = []
+    for opcode, operand in body:
+        if opcode == OPCode.out:
+            lines.append(f"    return {combo_operand(operand)} & 7")
+            break
+        lines.append(f"    {compile_instruction(opcode, operand)}")
+    return build_function("step", lines), shift
 
 
 # Starting from the end of the program and working our way to the front, we know for each
-# value of A, its successor must be in the range of (A * 8, A * 8 + 8) (since A' // 8 == A)
+# value of A, its predecessor must be in the range (A << shift, (A + 1) << shift), since
+# shifting it right again gives back A
 #
 # There are some "local" solutions which do not work for the entire program, so we need
 # to backtrack and keep checking until we find a solution that works for the entire program
-def compute_a(a: int, expected_outputs: list[int]) -> int | None:
-    for a in range(a, a + 8):
-        if run_one(a) == expected_outputs[0]:
+def compute_a(
+    a: int,
+    expected_outputs: list[int],
+    step: Step,
+    shift: int,
+    is_solution: Callable[[int], bool],
+) -> int | None:
+    for a in range(a, a + (1 << shift)):
+        if step(a, 0, 0) == expected_outputs[0]:
             if len(expected_outputs) == 1:
-                return a
-            next_a = compute_a(a * 8, expected_outputs[1:])
+                if is_solution(a):
+                    return a
+                continue
+            next_a = compute_a(
+                a << shift, expected_outputs[1:], step, shift, is_solution
+            )
             if next_a is not None:
                 return next_a
     return None
 
 
-def combo_operand(operand: int, *registers: int) -> int:
-    if operand >= 7:
-        raise Exception(f"Invalid operand {operand}")
-    if operand < 4:
-        return operand
-    return registers[operand - 4]
-
-
 def run(file: TextIO) -> Iterator[Any]:
     """Solution for Day 17."""
     registers, program = read_sections(file)
@@ -92,33 +154,16 @@ def run(file: TextIO) -> Iterator[Any]:
     register_c = int(regex_groups(REGISTER_REGEX, registers[2])[0])
     [instruction_string] = regex_groups(PROGRAM_REGEX, program[0])
     instructions = [int(x) for x in instruction_string.split(",")]
-    instruction_pointer = 0
-
-    output = []
-    while instruction_pointer < len(instructions):
-        opcode, operand = instructions[instruction_pointer : instruction_pointer + 2]
-        combo_operand_value = combo_operand(operand, register_a, register_b, register_c)
-        match OPCode(opcode):
-            case OPCode.adv:
-                register_a //= 2**combo_operand_value
-            case OPCode.bxl:
-                register_b ^= operand
-            case OPCode.bst:
-                register_b = combo_operand_value % 8
-            case OPCode.jnz:
-                if register_a != 0:
-                    instruction_pointer = operand
-                    continue
-            case OPCode.bxc:
-                register_b ^= register_c
-            case OPCode.out:
-                output.append(combo_operand_value % 8)
-            case OPCode.cdv:
-                register_c = register_a // 2**combo_operand_value
-            case _:
-                print(f"Unknown opcode {opcode}")
-                break
-        instruction_pointer += 2
+
+    compiled = compile_program(instructions)
+    output = compiled(register_a, register_b, register_c)
     yield ",".join(str(x) for x in output)
-    assert full_program(51064159) == output
-    yield compute_a(0, list(reversed(instructions)))
+
+    step, shift = compile_step(instructions)
+    yield compute_a(
+        0,
+        list(reversed(instructions)),
+        step,
+        shift,
+        lambda a: compiled(a, register_b, register_c) == instructions,
+    )
@@ -1,58 +1,139 @@
 """Day 18."""
+from __future__ import annotations
 
 from collections import deque
-from typing import Any, Iterator, TextIO
+from typing import Any, Callable, Iterator
 
-from utils.geometry import COMPASS, Point2D
-from utils.parse import read_lines
+import numpy as np
 
+from utils.buffer import InputBuffer
+from utils.geometry import Point2D
+from utils.union_find import DisjointSets
+
+INPUT_BUFFER = True
 WIDTH = 71
 HEIGHT = 71
 OBSTACLE_COUNT = 1024
 
+# Engines take the fall times, the cell each byte lands on, the row stride, and the
+# start and end cells, and return the index of the first byte that cuts them off
+Engine = Callable[[list[int], list[int], int, int, int], int | None]
+
+
+# Cells are indexed by y * stride + x inside a one cell border that is blocked from
+# the start, so no step needs a bounds check. Each cell holds the index of the first
+# byte to land on it, so it is blocked once that many bytes have fallen.
+def fall_times(obstacles: list[int], stride: int, height: int) -> list[int]:
+    times = np.full((height + 2) * stride, len(obstacles), dtype=np.int64)
+    cells, first = np.unique(np.array(obstacles, dtype=np.int64), return_index=True)
+    times[cells] = first
+    grid = times.reshape(height + 2, stride)
+    grid[[0, -1], :] = -1
+    grid[:, [0, -1]] = -1
+    return times.tolist()
+
 
 def bfs(
-    width: int, height: int, obstacles: set[Point2D], start: Point2D, end: Point2D
-) -> list[Point2D] | None:
-    queue = deque[tuple[Point2D, list[Point2D]]]([(start, [])])
-    visited = {start}
+    times: list[int], stride: int, start: int, end: int, fallen: int
+) -> list[int] | None:
+    """Find a shortest path once `fallen` bytes have landed, as a parent per cell."""
+    if times[start] < fallen:
+        return None
+    offsets = (-stride, stride, -1, 1)
+    parents = [-1] * len(times)
+    parents[start] = start
+    queue = deque([start])
     while queue:
-        pos, steps = queue.popleft()
-        if pos == end:
-            return steps
-        for d in COMPASS:
-            new_pos = pos + d
-            if new_pos in visited:
-                continue
-            if new_pos in obstacles:
-                continue
-            if 0 <= new_pos.x < width and 0 <= new_pos.y < height:
-                visited.add(new_pos)
-                queue.append((new_pos, steps + [new_pos]))
+        position = queue.popleft()
+        if position == end:
+            return parents
+        for offset in offsets:
+            new_position = position + offset
+            if parents[new_position] < 0 and times[new_position] >= fallen:
+                parents[new_position] = position
+                queue.append(new_position)
+    return None
+
+
+def path_length(parents: list[int], start: int, end: int) -> int:
+    steps = 0
+    while end != start:
+        end = parents[end]
+        steps += 1
+    return steps
+
+
+def binary_search(
+    times: list[int], obstacles: list[int], stride: int, start: int, end: int
+) -> int | None:
+    """Bisect the number of fallen bytes, with one BFS per probe."""
+    low, high = 0, len(obstacles)
+    if bfs(times, stride, start, end, high) is not None:
+        return None
+    # A path exists once `low` bytes have fallen, but not once `high` have
+    while high - low > 1:
+        middle = (low + high) // 2
+        if bfs(times, stride, start, end, middle) is None:
+            high = middle
+        else:
+            low = middle
+    return high - 1
+
+
+def union_find(
+    times: list[int], obstacles: list[int], stride: int, start: int, end: int
+) -> int | None:
+    """Let every byte fall, then lift them in reverse until start and end connect."""
+    count = len(obstacles)
+    cells = DisjointSets(len(times))
+    for idx, time in enumerate(times):
+        if time >= count:
+            if times[idx - stride] >= count:
+                cells.union(idx, idx - stride)
+            if times[idx - 1] >= count:
+                cells.union(idx, idx - 1)
+    if cells.connected(start, end):
+        return None
+
+    for byte in reversed(range(count)):
+        idx = obstacles[byte]
+        # Only the first byte to land on a cell blocks it
+        if times[idx] != byte:
+            continue
+        for neighbour in (idx - stride, idx + stride, idx - 1, idx + 1):
+            if times[neighbour] > byte:
+                cells.union(idx, neighbour)
+        if cells.connected(start, end):
+            return byte
     return None
 
 
-def run(file: TextIO) -> Iterator[Any]:
+ENGINES: dict[str, Engine] = {
+    "binary_search": binary_search,
+    "union_find": union_find,
+}
+
+
+def run(
+    buffer: InputBuffer,
+    width: int = WIDTH,
+    height: int = HEIGHT,
+    obstacle_count: int = OBSTACLE_COUNT,
+    engine: str = "union_find",
+) -> Iterator[Any]:
     """Solution for Day 18."""
-    obstacle_list = [
-        Point2D(*[int(c) for c in line.split(",")]) for line in read_lines(file)
-    ]
-    obstacles = set(obstacle_list[:OBSTACLE_COUNT])
-    remaining_obstacles = obstacle_list[OBSTACLE_COUNT:]
-    path_list = bfs(
-        WIDTH, HEIGHT, obstacles, Point2D(0, 0), Point2D(WIDTH - 1, HEIGHT - 1)
-    )
-    assert path_list is not None
-    yield len(path_list)
-
-    path = set(path_list)
-    for obstacle in remaining_obstacles:
-        obstacles.add(obstacle)
-        if obstacle in path:
-            path_list = bfs(
-                WIDTH, HEIGHT, obstacles, Point2D(0, 0), Point2D(WIDTH - 1, HEIGHT - 1)
-            )
-            if path_list is None:
-                yield obstacle
-                break
-            path = set(path_list)
+    columns = buffer.int_columns(2)
+    stride = width + 2
+    obstacles = ((columns[:, 1] + 1) * stride + columns[:, 0] + 1).tolist()
+    times = fall_times(obstacles, stride, height)
+    start = stride + 1
+    end = height * stride + width
+
+    parents = bfs(times, stride, start, end, obstacle_count)
+    assert parents is not None
+    yield path_length(parents, start, end)
+
+    blocker = ENGINES[engine](times, obstacles, stride, start, end)
+    if blocker is not None:
+        y, x = divmod(obstacles[blocker], stride)
+        yield Point2D(x - 1, y - 1)
@@ -1,31 +1,59 @@
 """Day 19."""
 
-from functools import cache
 from typing import Any, Iterator, TextIO
 
-from utils.parse import read_sections
+from utils.parse import read_lines
 
 
-@cache
-def matches(pattern: str, towels: tuple[str, ...]) -> int:
-    if pattern == "":
-        return 1
-    count = 0
-    for towel in towels:
-        if pattern.startswith(towel):
-            count += matches(pattern[len(towel) :], towels)
-    return count
+class TowelTrie:
+    """A trie over the towels, with node 0 as the root."""
+
+    def __init__(self, towels: list[str]) -> None:
+        self.children: list[dict[str, int]] = [{}]
+        self.is_towel = [False]
+        for towel in towels:
+            node = 0
+            for stripe in towel:
+                if stripe not in self.children[node]:
+                    self.children[node][stripe] = len(self.children)
+                    self.children.append({})
+                    self.is_towel.append(False)
+                node = self.children[node][stripe]
+            self.is_towel[node] = True
+
+    def arrangements(self, pattern: str) -> int:
+        """Count the ways to make the pattern out of towels.
+
+        ways[i] is the number of arrangements of pattern[i:], filled in from the end so
+        every towel starting at i only needs to look up a value already computed.
+        """
+        children = self.children
+        is_towel = self.is_towel
+        ways = [0] * len(pattern) + [1]
+        for start in reversed(range(len(pattern))):
+            count = 0
+            node = 0
+            for end in range(start, len(pattern)):
+                node = children[node].get(pattern[end], 0)
+                if not node:
+                    break
+                if is_towel[node]:
+                    count += ways[end + 1]
+            ways[start] = count
+        return ways[0]
 
 
 def run(file: TextIO) -> Iterator[Any]:
     """Solution for Day 19."""
-    [all_towels], patterns = read_sections(file)
+    lines = read_lines(file)
+    trie = TowelTrie(next(lines).split(", "))
+    next(lines)
 
     p1 = 0
     p2 = 0
-    towels = tuple(all_towels.split(", "))
-    for pattern in patterns:
-        count = matches(pattern, towels)
+    # The designs are streamed, and each only needs memory for its own table
+    for pattern in filter(None, lines):
+        count = trie.arrangements(pattern)
         if count > 0:
             p1 += 1
         p2 += count
@@ -2,73 +2,66 @@
 
 from typing import Any, Iterator, TextIO
 
-from utils.geometry import COMPASS, Point2D, get_grid_point
+import numpy as np
+import numpy.typing as npt
+
+from utils.geometry import Grid
 from utils.parse import read_lines
 
+WALL = ord("#")
+THRESHOLD = 100
+CHEAT_RADII = (2, 20)
 
-def bfs(
-    grid: list[list[str]],
-    start: Point2D,
-    end: Point2D,
-) -> dict[Point2D, int]:
-    queue = [(end, 0)]
-    distances = {end: 0}
-    while queue:
-        pos, distance = queue.pop(0)
-        if pos == start:
-            break
-        for direction in COMPASS:
-            new_pos = pos + direction
-            if new_pos in distances:
-                continue
-            if get_grid_point(grid, new_pos) == ".":
-                distances[new_pos] = distance + 1
-                queue.append((new_pos, distance + 1))
-    return distances
+Histogram = npt.NDArray[np.int64]
 
 
-def get_savings(
-    grid: list[list[str]], path: dict[Point2D, int], distance: int
-) -> list[int]:
-    results = []
-    for point in path:
-        results.extend(find_cheats(grid, path, point, distance))
-    return results
+def trace_path(grid: Grid, start: int, end: int) -> list[int]:
+    """Follow the track, which has no branches, from start to end."""
+    path = [start]
+    previous = position = start
+    while position != end:
+        [following] = [
+            neighbour
+            for neighbour in grid.neighbours(position)
+            if grid.cells[neighbour] != WALL and neighbour != previous
+        ]
+        previous, position = position, following
+        path.append(position)
+    return path
 
 
-def find_cheats(
-    grid: list[list[str]], path: dict[Point2D, int], start: Point2D, distance: int
-) -> list[int]:
-    result = []
-    for x_offset in range(-distance, distance + 1):
-        remaining_distance = distance - abs(x_offset)
-        for y_offset in range(-remaining_distance, remaining_distance + 1):
-            p = Point2D(start.x + x_offset, start.y + y_offset)
-            if get_grid_point(grid, p) == ".":
-                savings = path[start] - path[p] - abs(x_offset) - abs(y_offset)
-                if savings > 0:
-                    result.append(savings)
-    return result
+# Cells are indexed by their position along the path, so cheating from cell i to cell
+# j > i saves (j - i) minus the length of the cheat. Only pairs at least min_saving + 2
+# apart along the path can save enough to matter.
+def count_cheats(
+    grid: Grid, path: list[int], radii: tuple[int, ...], min_saving: int
+) -> list[Histogram]:
+    """Count cheats of up to each radius by how much time they save."""
+    y, x = np.divmod(np.array(path, dtype=np.int64), grid.stride)
+    histograms = [np.zeros(len(path), dtype=np.int64) for _ in radii]
+    longest = max(radii)
+    for i in range(len(path) - min_saving - 2):
+        ahead = i + min_saving + 2
+        lengths = np.abs(x[ahead:] - x[i]) + np.abs(y[ahead:] - y[i])
+        savings = np.arange(ahead - i, len(path) - i) - lengths
+        # Filter once for the longest radius, then each radius counts a subset
+        usable = (lengths <= longest) & (savings >= min_saving)
+        lengths = lengths[usable]
+        savings = savings[usable]
+        for radius, histogram in zip(radii, histograms):
+            counts = np.bincount(savings[lengths <= radius])
+            histogram[: len(counts)] += counts
+    return histograms
 
 
-def run(file: TextIO) -> Iterator[Any]:
-    """Solution for Day 20."""
-    grid = []
-    for y, line in enumerate(read_lines(file)):
-        row = []
-        for x, c in enumerate(line):
-            if c == "S":
-                start = Point2D(x, y)
-                row.append(".")
-            elif c == "E":
-                end = Point2D(x, y)
-                row.append(".")
-            else:
-                row.append(c)
-        grid.append(row)
+def cheats_saving(histogram: Histogram, threshold: int) -> int:
+    return int(histogram[threshold:].sum())
 
-    path = bfs(grid, start, end)
-    savings = get_savings(grid, path, 2)
-    savings_p2 = get_savings(grid, path, 20)
-    yield len([x for x in savings if x >= 100])
-    yield len([x for x in savings_p2 if x >= 100])
+
+def run(file: TextIO, threshold: int = THRESHOLD) -> Iterator[Any]:
+    """Solution for Day 20."""
+    grid = Grid(read_lines(file))
+    path = trace_path(grid, grid.find("S"), grid.find("E"))
+    short_cheats, long_cheats = count_cheats(grid, path, CHEAT_RADII, threshold)
+    yield cheats_saving(short_cheats, threshold)
+    yield cheats_saving(long_cheats, threshold)
@@ -1,20 +1,13 @@
 """Day 21."""
 
-from collections import deque
-from functools import cache
-from itertools import pairwise
-from typing import Any, Callable, Iterator, TextIO
-
-from utils.geometry import (
-    COMPASS,
-    DOWN,
-    LEFT,
-    RIGHT,
-    UP,
-    Point2D,
-    get_grid_point,
-    iter_grid,
-)
+from collections.abc import Iterator
+from itertools import islice, pairwise
+from typing import Any, TextIO
+
+import numpy as np
+import numpy.typing as npt
+
+from utils.geometry import COMPASS, DOWN, LEFT, RIGHT, UP, Point2D, get_grid_point
 from utils.parse import read_lines
 
 DIRECTION_LOOKUP = {
@@ -33,105 +26,119 @@ DIRECTIONAL_PAD: list[list[str | None]] = [
     [None, "^", "A"],
     ["<", "v", ">"],
 ]
+DIRECTIONAL_KEYS = "^A<v>"
+INT64_LIMIT = 2**63
+
+# costs[a, b] is the fewest presses by the human to move a robot's arm from key a to
+# key b on its pad and press b, indexed in the order of the pad's keys
+Costs = npt.NDArray[Any]
 
 
-def bfs(
-    grid: list[list[str | None]],
-    start: Point2D,
-    end: Point2D,
-) -> list[list[str]]:
-    queue = deque[tuple[Point2D, list[str], set[Point2D]]]([(start, [], set())])
-    paths = []
-    while queue:
-        pos, path, visited = queue.popleft()
-        visited |= {pos}
-        if pos == end:
-            paths.append(path + ["A"])
+def simple_paths(
+    pad: list[list[str | None]], start: Point2D, end: Point2D
+) -> Iterator[str]:
+    """Find every route from start to end that doesn't revisit a key."""
+    visited = {start}
+    moves: list[str] = []
+
+    def visit(position: Point2D) -> Iterator[str]:
+        if position == end:
+            yield "".join(moves) + "A"
+            return
         for direction in COMPASS:
-            new_pos = pos + direction
-            if new_pos in visited:
+            new_position = position + direction
+            if new_position in visited or get_grid_point(pad, new_position) is None:
                 continue
-            if get_grid_point(grid, new_pos) is not None:
-                queue.append((new_pos, path + [DIRECTION_LOOKUP[direction]], visited))
-    return paths
-
-
-def precompute_paths(
-    grid: list[list[str | None]],
-) -> dict[tuple[Point2D, Point2D], list[list[str]]]:
-    paths = {}
-    for start_value, start in iter_grid(grid):
-        if start_value is not None:
-            for end_value, end in iter_grid(grid):
-                if end_value is not None:
-                    path = bfs(grid, start, end)
-                    paths[start, end] = path
-    return paths
-
-
-@cache
-def best_path(
-    a: str,
-    b: str,
-    lookup: Callable[[str, str], list[list[str]]],
-    next_lookup: Callable[[str, str], list[list[str]]],
-    robots: int,
-) -> int:
-    paths = lookup(a, b)
-    return min(
-        compute_cost(path, next_lookup, next_lookup, robots - 1) for path in paths
+            visited.add(new_position)
+            moves.append(DIRECTION_LOOKUP[direction])
+            yield from visit(new_position)
+            moves.pop()
+            visited.remove(new_position)
+
+    return visit(start)
+
+
+def move_counts(sequence: str, keys: str) -> list[int]:
+    """Count each move between keys made typing the sequence, starting at A."""
+    counts = [0] * len(keys) ** 2
+    for a, b in pairwise("A" + sequence):
+        counts[keys.index(a) * len(keys) + keys.index(b)] += 1
+    return counts
+
+
+class Keypad:
+    """Every route between each pair of keys on a pad, as counts of directional moves.
+
+    The counts are of the moves the robot (or human) above has to make, so the cost
+    matrix for this pad is a min-plus product: each route costs the dot product of its
+    counts with the costs one layer up, and each pair of keys takes its cheapest route.
+    """
+
+    def __init__(self, pad: list[list[str | None]]) -> None:
+        positions = {
+            key: Point2D(x, y)
+            for y, row in enumerate(pad)
+            for x, key in enumerate(row)
+            if key is not None
+        }
+        self.keys = "".join(positions)
+        routes = []
+        self.pair_starts = []
+        for a in self.keys:
+            for b in self.keys:
+                self.pair_starts.append(len(routes))
+                routes.extend(
+                    move_counts(path, DIRECTIONAL_KEYS)
+                    for path in simple_paths(pad, positions[a], positions[b])
+                )
+        self.routes = np.array(routes, dtype=np.int64)
+        self.longest_route = int(self.routes.sum(axis=1).max())
+
+    def costs(self, above: Costs) -> Costs:
+        # Fall back to Python ints once the products could overflow
+        largest = int(above.max()) * self.longest_route
+        if above.dtype != object and largest >= INT64_LIMIT:
+            above = above.astype(object)
+        route_costs = self.routes.astype(above.dtype, copy=False) @ above.reshape(-1)
+        best = np.minimum.reduceat(route_costs, self.pair_starts)
+        return best.reshape(len(self.keys), len(self.keys))
+
+    def sequence_counts(self, sequences: list[str]) -> npt.NDArray[np.int64]:
+        return np.array(
+            [move_counts(sequence, self.keys) for sequence in sequences], dtype=np.int64
+        ).reshape(len(sequences), -1)
+
+
+NUMERIC = Keypad(NUMERIC_PAD)
+DIRECTIONAL = Keypad(DIRECTIONAL_PAD)
+
+
+def directional_costs() -> Iterator[Costs]:
+    """Yield the cost matrix for a directional pad with 0, 1, 2... robots above it."""
+    # The human presses keys directly
+    costs: Costs = np.ones((len(DIRECTIONAL_KEYS), len(DIRECTIONAL_KEYS)), np.int64)
+    while True:
+        yield costs
+        costs = DIRECTIONAL.costs(costs)
+
+
+def complexity(codes: list[str], robots: int) -> int:
+    """Sum the complexities of the codes with `robots` directional pads in between."""
+    [above] = islice(directional_costs(), robots, robots + 1)
+    door = NUMERIC.costs(above)
+    # Each press of a code adds one door cost, so the sums can overflow too
+    largest = int(door.max()) * max((len(code) for code in codes), default=0)
+    if door.dtype != object and largest >= INT64_LIMIT:
+        door = door.astype(object)
+    counts = NUMERIC.sequence_counts(codes).astype(door.dtype, copy=False)
+    lengths = counts @ door.reshape(-1)
+    return sum(
+        int(code.rstrip("A")) * int(length) for code, length in zip(codes, lengths)
     )
 
 
-def compute_cost(
-    path: list[str],
-    lookup: Callable[[str, str], list[list[str]]],
-    next_lookup: Callable[[str, str], list[list[str]]],
-    robots: int,
-) -> int:
-    if robots == 0:
-        return len(path)
-    total_cost = 0
-    for a, b in pairwise(["A"] + path):
-        total_cost += best_path(a, b, lookup, next_lookup, robots)
-    return total_cost
-
-
-def compute_total_cost(
-    lines: list[str],
-    get_numeric_paths: Callable[[str, str], list[list[str]]],
-    get_directional_paths: Callable[[str, str], list[list[str]]],
-    robots: int,
-) -> int:
-    total_cost = 0
-    for line in lines:
-        cost = compute_cost(
-            ["A"] + list(line), get_numeric_paths, get_directional_paths, robots
-        )
-        cost -= 1  # Account for the extra "A" in the path
-        total_cost += int(line.rstrip("A")) * cost
-    return total_cost
-
-
 def run(file: TextIO) -> Iterator[Any]:
     """Solution for Day 21."""
-    numeric_paths = precompute_paths(NUMERIC_PAD)
-    directional_paths = precompute_paths(DIRECTIONAL_PAD)
-
-    numeric_position_lookup = {c: pos for c, pos in iter_grid(NUMERIC_PAD)}
-    directional_position_lookup = {c: pos for c, pos in iter_grid(DIRECTIONAL_PAD)}
-
-    def get_numeric_paths(start: str, end: str) -> list[list[str]]:
-        return numeric_paths[
-            numeric_position_lookup[start], numeric_position_lookup[end]
-        ]
-
-    def get_directional_paths(start: str, end: str) -> list[list[str]]:
-        return directional_paths[
-            directional_position_lookup[start], directional_position_lookup[end]
-        ]
-
-    lines = list(read_lines(file))
-
-    yield compute_total_cost(lines, get_numeric_paths, get_directional_paths, 3)
-    yield compute_total_cost(lines, get_numeric_paths, get_directional_paths, 26)
+    codes = list(read_lines(file))
+    yield complexity(codes, 2)
+    yield complexity(codes, 25)
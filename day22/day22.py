@@ -1,40 +1,64 @@
 """Day 22."""
 
-from collections import defaultdict, deque
-from typing import Any, Iterator, TextIO
+from typing import Any, Iterator
 
-from utils.parse import read_lines
+import numpy as np
+import numpy.typing as npt
 
+from utils.buffer import InputBuffer
 
-def simulate(secret: int) -> int:
-    secret = ((secret * 64) ^ secret) % 16777216
-    secret = ((secret // 32) ^ secret) % 16777216
-    return ((secret * 2048) ^ secret) % 16777216
+INPUT_BUFFER = True
+MASK = 16777215
+STEPS = 2000
+# A window of four price deltas in -9..9, encoded as a base 19 number
+WINDOW_SIZE = 4
+WINDOWS = 19**WINDOW_SIZE
+# Buyers simulated together; bounds the seen bitmap to about 16KB per buyer
+CHUNK_SIZE = 2048
 
+Secrets = npt.NDArray[np.uint32]
 
-def simulate_steps(secret: int, steps: int) -> tuple[int, dict[tuple[int, ...], int]]:
-    deltas = deque[int](maxlen=4)
-    sequences = {}
-    for _ in range(steps):
-        new_secret = simulate(secret)
-        price_delta = (new_secret % 10) - (secret % 10)
-        deltas.append(price_delta)
-        if len(deltas) == 4:
-            sequence = tuple(deltas)
-            if sequence not in sequences:
-                sequences[sequence] = new_secret % 10
-        secret = new_secret
-    return secret, sequences
 
+# Works on plain ints as well as arrays, where uint32 wraparound keeps the low 24 bits
+def simulate(secret: Secrets) -> Secrets:
+    secret = ((secret << 6) ^ secret) & MASK
+    secret = ((secret >> 5) ^ secret) & MASK
+    return ((secret << 11) ^ secret) & MASK
 
-def run(file: TextIO) -> Iterator[Any]:
+
+def simulate_steps(
+    secrets: Secrets, steps: int, bananas: npt.NDArray[np.int64]
+) -> Secrets:
+    """Advance every buyer, adding the price at the first sight of each window."""
+    row_bytes = (WINDOWS + 7) // 8
+    seen = np.zeros(len(secrets) * row_bytes, dtype=np.uint8)
+    rows = np.arange(len(secrets), dtype=np.int64) * row_bytes
+    windows = np.zeros(len(secrets), dtype=np.int64)
+    prices = (secrets % 10).astype(np.int64)
+    for step in range(steps):
+        secrets = simulate(secrets)
+        new_prices = (secrets % 10).astype(np.int64)
+        windows = (windows * 19 + new_prices - prices + 9) % WINDOWS
+        prices = new_prices
+        if step < WINDOW_SIZE - 1:
+            continue
+        seen_bytes = rows + (windows >> 3)
+        seen_bits = np.left_shift(1, windows & 7).astype(np.uint8)
+        seen_before = seen[seen_bytes]
+        first = (seen_before & seen_bits) == 0
+        # Every buyer has its own row, so no two buyers write to the same byte
+        seen[seen_bytes] = seen_before | seen_bits
+        np.add.at(bananas, windows[first], prices[first])
+    return secrets
+
+
+def run(buffer: InputBuffer) -> Iterator[Any]:
     """Solution for Day 22."""
+    secrets = buffer.ints().astype(np.uint32)
+    bananas = np.zeros(WINDOWS, dtype=np.int64)
     total = 0
-    bananas_per_sequence = defaultdict[tuple[int, ...], int](int)
-    for line in read_lines(file):
-        result, sequences = simulate_steps(int(line), 2000)
-        for sequence, bananas in sequences.items():
-            bananas_per_sequence[sequence] += bananas
-        total += result
+    for start in range(0, len(secrets), CHUNK_SIZE):
+        results = simulate_steps(secrets[start : start + CHUNK_SIZE], STEPS, bananas)
+        total += int(results.sum(dtype=np.int64))
     yield total
-    yield max(bananas_per_sequence.values())
+    yield int(bananas.max())
@@ -1,53 +1,170 @@
 """Day 23."""
 
-from collections import defaultdict
-from typing import Any, Iterator, TextIO
+from heapq import heappush, heappushpop
+from typing import Any, Callable, Iterator, TextIO
 
 from utils.parse import read_lines
 
+# Sets of computers are ints with bit i set for the computer with id i
+Bitset = int
 
-def find_triangles(connections: dict[str, set[str]]) -> set[tuple[str, ...]]:
-    triangles = set()
-    for start in connections:
-        for end in connections[start]:
-            for third in connections[end]:
-                if start in connections[third]:
-                    triangle = tuple(sorted([start, end, third]))
-                    triangles.add(triangle)
-    return triangles
-
-
-# A quick google search says this is the easiest solution
-def bron_kerbosch(
-    R: set[str], P: set[str], X: set[str], connections: dict[str, set[str]]
-) -> set[str] | None:
-    if not P and not X:
-        return R
-    max_set = None
-    for v in P.copy():
-        result = bron_kerbosch(
-            R | {v}, P & connections[v], X & connections[v], connections
+
+class Network:
+    def __init__(self, links: Iterator[tuple[str, str]]) -> None:
+        pairs = list(links)
+        self.names = sorted({name for pair in pairs for name in pair})
+        ids = {name: i for i, name in enumerate(self.names)}
+        self.neighbours = [0] * len(self.names)
+        for a, b in pairs:
+            self.neighbours[ids[a]] |= 1 << ids[b]
+            self.neighbours[ids[b]] |= 1 << ids[a]
+
+    def select(self, predicate: Callable[[str], bool]) -> Bitset:
+        return sum(1 << i for i, name in enumerate(self.names) if predicate(name))
+
+    def names_of(self, computers: Bitset) -> list[str]:
+        return [self.names[i] for i in iter_bits(computers)]
+
+
+def iter_bits(bits: Bitset) -> Iterator[int]:
+    while bits:
+        lowest = bits & -bits
+        yield lowest.bit_length() - 1
+        bits ^= lowest
+
+
+def count_triangles(network: Network, computers: Bitset) -> int:
+    """Count the triangles among the computers, each once as ids u < v < w."""
+    count = 0
+    for u in iter_bits(computers):
+        later = (network.neighbours[u] & computers) >> (u + 1) << (u + 1)
+        for v in iter_bits(later):
+            count += ((later & network.neighbours[v]) >> (v + 1)).bit_count()
+    return count
+
+
+def degeneracy_order(network: Network) -> list[int]:
+    """Order the computers by repeatedly taking one with the fewest remaining links."""
+    degrees = [neighbours.bit_count() for neighbours in network.neighbours]
+    buckets = [set[int]() for _ in range(max(degrees, default=0) + 1)]
+    for computer, degree in enumerate(degrees):
+        buckets[degree].add(computer)
+
+    order = []
+    removed = 0
+    smallest = 0
+    for _ in degrees:
+        # Removing a computer lowers its neighbours' degrees by at most one
+        smallest = max(smallest - 1, 0)
+        while not buckets[smallest]:
+            smallest += 1
+        computer = buckets[smallest].pop()
+        order.append(computer)
+        removed |= 1 << computer
+        for neighbour in iter_bits(network.neighbours[computer] & ~removed):
+            buckets[degrees[neighbour]].remove(neighbour)
+            degrees[neighbour] -= 1
+            buckets[degrees[neighbour]].add(neighbour)
+    return order
+
+
+def expand(
+    neighbours: list[Bitset],
+    clique: Bitset,
+    candidates: Bitset,
+    excluded: Bitset,
+    floor: Callable[[], int] | None,
+) -> Iterator[Bitset]:
+    """Bron-Kerbosch with Tomita pivoting."""
+    if floor is not None and clique.bit_count() + candidates.bit_count() <= floor():
+        return
+    if not candidates:
+        if not excluded:
+            yield clique
+        return
+    # Any maximal clique holds the pivot or one of its non-neighbours
+    pivot = max(
+        iter_bits(candidates | excluded),
+        key=lambda u: (candidates & neighbours[u]).bit_count(),
+    )
+    for v in iter_bits(candidates & ~neighbours[pivot]):
+        yield from expand(
+            neighbours,
+            clique | 1 << v,
+            candidates & neighbours[v],
+            excluded & neighbours[v],
+            floor,
         )
-        if result is not None and (max_set is None or len(result) > len(max_set)):
-            max_set = result
-        P.remove(v)
-        X.add(v)
-    return max_set
+        candidates &= ~(1 << v)
+        excluded |= 1 << v
+
+
+def maximal_cliques(
+    network: Network, floor: Callable[[], int] | None = None
+) -> Iterator[Bitset]:
+    """Find every maximal clique, starting from each computer in degeneracy order.
+
+    Each computer only searches its own neighbourhood, renumbered so its bitsets are
+    as wide as its degree rather than the whole network. Neighbours earlier in the
+    order are excluded, since their cliques have already been found.
+    If floor is given, branches that can't grow a clique beyond floor() are skipped.
+    """
+    order = degeneracy_order(network)
+    rank = [0] * len(order)
+    for position, computer in enumerate(order):
+        rank[computer] = position
+
+    def local_floor() -> int:
+        # The computer itself is already in the clique
+        return floor() - 1 if floor is not None else 0
+
+    for computer in order:
+        links = network.neighbours[computer]
+        if floor is not None and links.bit_count() < floor():
+            continue
+        members = list(iter_bits(links))
+        index = {member: i for i, member in enumerate(members)}
+        local = [
+            sum(1 << index[w] for w in iter_bits(network.neighbours[u] & links))
+            for u in members
+        ]
+        later = sum(
+            1 << i for i, member in enumerate(members) if rank[member] > rank[computer]
+        )
+        everyone = (1 << len(members)) - 1
+        for clique in expand(
+            local,
+            0,
+            later,
+            everyone & ~later,
+            local_floor if floor is not None else None,
+        ):
+            yield 1 << computer | sum(1 << members[i] for i in iter_bits(clique))
+
+
+def top_cliques(network: Network, k: int) -> list[Bitset]:
+    """Find the k largest maximal cliques, largest first."""
+    best: list[tuple[int, Bitset]] = []
+
+    def floor() -> int:
+        return best[0][0] if len(best) == k else 0
+
+    for clique in maximal_cliques(network, floor):
+        if len(best) < k:
+            heappush(best, (clique.bit_count(), clique))
+        else:
+            heappushpop(best, (clique.bit_count(), clique))
+    return [clique for _, clique in sorted(best, reverse=True)]
 
 
 def run(file: TextIO) -> Iterator[Any]:
     """Solution for Day 23."""
-    connections = defaultdict[str, set[str]](set)
-    for line in read_lines(file):
-        start, end = line.split("-")
-        connections[start].add(end)
-        connections[end].add(start)
-
-    triangles = find_triangles(connections)
-    triangles_with_t = {
-        triangle for triangle in triangles if any(n.startswith("t") for n in triangle)
-    }
-    yield len(triangles_with_t)
-    p2 = bron_kerbosch(set(), set(connections.keys()), set(), connections)
-    assert p2 is not None
-    yield ",".join(sorted(p2))
+    network = Network(tuple(line.split("-")) for line in read_lines(file))
+
+    # Triangles with a t computer are all of them minus those with none
+    everyone = network.select(lambda name: True)
+    no_t = network.select(lambda name: not name.startswith("t"))
+    yield count_triangles(network, everyone) - count_triangles(network, no_t)
+
+    [largest] = top_cliques(network, 1)
+    yield ",".join(sorted(network.names_of(largest)))
@@ -2,7 +2,7 @@
 
 from typing import Any, Iterator, TextIO
 
-from utils.parse import read_sections
+from utils.parse import iter_sections
 
 
 def parse(diagram: list[str]) -> tuple[int, ...]:
@@ -17,7 +17,7 @@ def run(file: TextIO) -> Iterator[Any]:
     """Solution for Day 25."""
     keys = []
     locks = []
-    for section in read_sections(file):
+    for section in iter_sections(file):
         if section[0] == "#####":
             locks.append(parse(section))
         elif section[0] == ".....":
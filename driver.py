@@ -1,5 +1,9 @@
 """The driver program that is the main entrypoint for the application."""
 import importlib
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
 
@@ -7,9 +11,38 @@ import click
 from cookiecutter.main import cookiecutter
 
 from driver_helpers.aoc_site import download_problem_input
+from driver_helpers.bench_history import (
+    compare_commits,
+    current_commit,
+    hash_input,
+    resolve_commit,
+    save_results,
+)
+from driver_helpers.benchmark import benchmark
+from driver_helpers.runner import day_string, open_input, solve
 
 YEAR = 2024
 CURR_DAY = datetime.now().day
+BENCH_HISTORY = Path("bench_history.sqlite")
+DAYS = range(1, 26)
+# Known slowest days, longest first, so the pool starts on them straight away
+SLOWEST_DAYS = [6, 20, 24, 22, 14, 16, 9, 18]
+
+
+def get_input_file(day: int, input_file_name: str) -> Path:
+    """Find the input file for a day, downloading the real input if it is missing."""
+    input_file = Path(f"day{day_string(day)}") / input_file_name
+    if input_file_name == "input" and not input_file.is_file():
+        with input_file.open("wb") as fout:
+            download_problem_input(fout, YEAR, day)
+    return input_file
+
+
+def expected_cost(day: int) -> int:
+    """Rank a day by how long it is known to take, lower is slower."""
+    if day in SLOWEST_DAYS:
+        return SLOWEST_DAYS.index(day)
+    return len(SLOWEST_DAYS)
 
 
 @click.group()
@@ -21,7 +54,7 @@ def cli() -> None:
 @click.argument("day", default=CURR_DAY)
 def bootstrap(day: int) -> None:
     """Initialize a new folder for a day using the template and download the input."""
-    day_str = str(day).zfill(2)
+    day_str = day_string(day)
     cookiecutter("./template", extra_context={"day": day_str}, no_input=True)
     with (Path(f"day{day_str}") / "input").open("wb") as fout:
         download_problem_input(fout, YEAR, day)
@@ -32,14 +65,11 @@ def bootstrap(day: int) -> None:
 @click.option("-i", "--input-file", "input_file_name", default="input")
 def run(day: int, input_file_name: str) -> None:
     """Run the problem on the provided day."""
-    day_str = str(day).zfill(2)
-    input_file = Path(f"day{day_str}") / input_file_name
-    if input_file_name == "input" and not input_file.is_file():
-        with input_file.open("wb") as fout:
-            download_problem_input(fout, YEAR, day)
+    day_str = day_string(day)
+    input_file = get_input_file(day, input_file_name)
 
     module = importlib.import_module(f"day{day_str}.day{day_str}")
-    with open(input_file, "r", encoding="utf-8") as fin:
+    with open_input(module, input_file) as fin:
         iterator = module.run(fin)
         print("Part 1:")
         print(next(iterator, None))
@@ -47,5 +77,120 @@ def run(day: int, input_file_name: str) -> None:
         print(next(iterator, None))
 
 
+@cli.command("run-all")
+@click.option(
+    "-i", "--input-file", "input_file_names", default=["input"], multiple=True
+)
+@click.option("-w", "--workers", type=int, default=None)
+def run_all(input_file_names: tuple[str, ...], workers: int | None) -> None:
+    """Run every day against each input file in a process pool."""
+    jobs = []
+    for day in sorted(DAYS, key=expected_cost):
+        if not Path(f"day{day_string(day)}").is_dir():
+            continue
+        for input_file_name in input_file_names:
+            input_file = get_input_file(day, input_file_name)
+            if input_file.is_file():
+                jobs.append((day, input_file))
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(solve, day, input_file): (day, input_file)
+            for day, input_file in jobs
+        }
+        for future in as_completed(futures):
+            day, input_file = futures[future]
+            try:
+                answers, elapsed = future.result()
+            except Exception as e:
+                print(f"Day {day_string(day)} ({input_file.name}) failed: {e!r}")
+                continue
+            print(f"Day {day_string(day)} ({input_file.name}) in {elapsed:.3f}s")
+            for part, answer in enumerate(answers, start=1):
+                print(f"Part {part}:")
+                print(answer)
+    print(f"Total: {time.perf_counter() - start:.3f}s")
+
+
+@cli.group()
+def bench() -> None:
+    """Benchmark solutions."""
+
+
+@bench.command("run")
+@click.argument("days", type=int, nargs=-1)
+@click.option("-i", "--input-file", "input_file_name", default="input")
+@click.option("-n", "--repeat", default=10)
+@click.option("-w", "--warmup", default=1)
+@click.option("-o", "--output", "output_file", type=click.Path(path_type=Path))
+@click.option("--save/--no-save", default=True)
+@click.option("--history", type=click.Path(path_type=Path), default=BENCH_HISTORY)
+def bench_run(
+    days: tuple[int, ...],
+    input_file_name: str,
+    repeat: int,
+    warmup: int,
+    output_file: Path | None,
+    save: bool,
+    history: Path,
+) -> None:
+    """Time each part of the provided days, or every day if none are provided."""
+    if not days:
+        days = tuple(day for day in DAYS if Path(f"day{day_string(day)}").is_dir())
+    commit = current_commit() if save else None
+
+    results = []
+    for day in days:
+        input_file = get_input_file(day, input_file_name)
+        day_results = benchmark(day, input_file, repeat, warmup)
+        if commit is not None:
+            save_results(history, commit, hash_input(input_file), day_results)
+        for result in day_results:
+            print(
+                f"Day {day_string(day)} Part {result.part}: "
+                f"min {result.min:.6f}s "
+                f"median {result.median:.6f}s "
+                f"p95 {result.p95:.6f}s"
+            )
+            results.append(result)
+
+    if output_file is not None:
+        output_file.write_text(
+            json.dumps([result.to_json() for result in results], indent=2)
+        )
+
+
+@bench.command("compare")
+@click.argument("baseline")
+@click.option("-c", "--commit", default=None)
+@click.option("-t", "--threshold", default=0.1, help="Allowed fractional slowdown.")
+@click.option("--history", type=click.Path(path_type=Path), default=BENCH_HISTORY)
+def bench_compare(
+    baseline: str, commit: str | None, threshold: float, history: Path
+) -> None:
+    """Flag every day and part whose median is slower than on the baseline commit."""
+    baseline = resolve_commit(baseline)
+    commit = current_commit() if commit is None else resolve_commit(commit)
+    comparisons = compare_commits(history, baseline, commit)
+    if not comparisons:
+        print(f"No shared benchmarks between {baseline} and {commit}")
+        return
+
+    regressions = 0
+    for comparison in comparisons:
+        regressed = comparison.change > threshold
+        regressions += regressed
+        print(
+            f"Day {day_string(comparison.day)} Part {comparison.part} "
+            f"({comparison.input_file}): "
+            f"{comparison.baseline_median:.6f}s -> {comparison.median:.6f}s "
+            f"({comparison.change:+.1%})" + (" SLOWER" if regressed else "")
+        )
+    if regressions:
+        print(f"{regressions} regression(s) over {threshold:.0%}")
+        sys.exit(1)
+
+
 if __name__ == "__main__":
     cli()
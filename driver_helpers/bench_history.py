@@ -0,0 +1,125 @@
+"""Helpers for storing benchmark results and comparing them across commits."""
+import hashlib
+import platform
+import sqlite3
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+
+from driver_helpers.benchmark import BenchmarkResult
+
+DIRTY_SUFFIX = "-dirty"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS benchmarks (
+    git_commit TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    part INTEGER NOT NULL,
+    input_hash TEXT NOT NULL,
+    python_version TEXT NOT NULL,
+    input_file TEXT NOT NULL,
+    repeat INTEGER NOT NULL,
+    min REAL NOT NULL,
+    median REAL NOT NULL,
+    p95 REAL NOT NULL,
+    PRIMARY KEY (git_commit, day, part, input_hash, python_version)
+)
+"""
+
+
+@dataclass
+class Comparison:
+    day: int
+    part: int
+    input_file: str
+    baseline_median: float
+    median: float
+
+    @property
+    def change(self) -> float:
+        return (self.median - self.baseline_median) / self.baseline_median
+
+
+def resolve_commit(ref: str) -> str:
+    """Resolve a git ref to a full commit hash, keeping any dirty marker."""
+    dirty = ref.endswith(DIRTY_SUFFIX)
+    if dirty:
+        ref = ref.removesuffix(DIRTY_SUFFIX)
+    commit = subprocess.run(
+        ["git", "rev-parse", "--verify", f"{ref}^{{commit}}"],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout.strip()
+    return commit + DIRTY_SUFFIX if dirty else commit
+
+
+def current_commit() -> str:
+    """Get the checked out commit, marked dirty if there are uncommitted changes."""
+    status = subprocess.run(
+        ["git", "status", "--porcelain", "--untracked-files=no"],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+    return resolve_commit("HEAD" + (DIRTY_SUFFIX if status else ""))
+
+
+def hash_input(input_file: Path) -> str:
+    return hashlib.sha256(input_file.read_bytes()).hexdigest()
+
+
+def save_results(
+    db_path: Path, commit: str, input_hash: str, results: list[BenchmarkResult]
+) -> None:
+    """Store benchmark results, replacing any earlier run with the same key."""
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute(SCHEMA)
+        conn.executemany(
+            "INSERT OR REPLACE INTO benchmarks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    commit,
+                    result.day,
+                    result.part,
+                    input_hash,
+                    platform.python_version(),
+                    result.input_file,
+                    len(result.times),
+                    result.min,
+                    result.median,
+                    result.p95,
+                )
+                for result in results
+            ],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def compare_commits(db_path: Path, baseline: str, commit: str) -> list[Comparison]:
+    """Pair up the medians of two commits that share a day, part, input and Python."""
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute(SCHEMA)
+        return [
+            Comparison(*row)
+            for row in conn.execute(
+                """
+                SELECT cur.day, cur.part, cur.input_file, base.median, cur.median
+                FROM benchmarks cur
+                JOIN benchmarks base
+                    ON base.day = cur.day
+                    AND base.part = cur.part
+                    AND base.input_hash = cur.input_hash
+                    AND base.python_version = cur.python_version
+                WHERE base.git_commit = ? AND cur.git_commit = ?
+                ORDER BY cur.day, cur.part, cur.input_file
+                """,
+                (baseline, commit),
+            )
+        ]
+    finally:
+        conn.close()
@@ -0,0 +1,85 @@
+"""Helpers for benchmarking solutions."""
+from __future__ import annotations
+
+import importlib
+import statistics
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+from driver_helpers.runner import day_string, wrap_input
+
+PARTS = 2
+
+
+@dataclass
+class BenchmarkResult:
+    day: int
+    part: int
+    input_file: str
+    times: list[float] = field(default_factory=list)
+
+    @property
+    def min(self) -> float:
+        return min(self.times)
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.times)
+
+    @property
+    def p95(self) -> float:
+        if len(self.times) < 2:
+            return self.times[0]
+        return statistics.quantiles(self.times, n=20, method="inclusive")[-1]
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "day": self.day,
+            "part": self.part,
+            "input_file": self.input_file,
+            "times": self.times,
+            "min": self.min,
+            "median": self.median,
+            "p95": self.p95,
+        }
+
+
+def clear_caches(module: ModuleType) -> None:
+    """Clear any functools caches in a solution so every repetition starts cold."""
+    for value in vars(module).values():
+        if callable(getattr(value, "cache_clear", None)):
+            value.cache_clear()
+
+
+def time_parts(module: ModuleType, contents: bytes) -> list[float]:
+    """Time each part of a solution separately, excluding import and file reading."""
+    clear_caches(module)
+    iterator = module.run(wrap_input(module, contents))
+    times = []
+    for _ in range(PARTS):
+        start = time.perf_counter()
+        next(iterator, None)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def benchmark(
+    day: int, input_file: Path, repeat: int, warmup: int
+) -> list[BenchmarkResult]:
+    """Benchmark both parts of a day's solution."""
+    day_str = day_string(day)
+    module = importlib.import_module(f"day{day_str}.day{day_str}")
+    contents = input_file.read_bytes()
+    results = [
+        BenchmarkResult(day, part, input_file.name) for part in range(1, PARTS + 1)
+    ]
+
+    for _ in range(warmup):
+        time_parts(module, contents)
+    for _ in range(repeat):
+        for result, elapsed in zip(results, time_parts(module, contents)):
+            result.times.append(elapsed)
+    return results
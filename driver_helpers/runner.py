@@ -0,0 +1,44 @@
+"""Helpers for running solutions outside of the cli process."""
+import importlib
+import io
+import time
+from pathlib import Path
+from types import ModuleType
+from typing import Any, ContextManager, TextIO
+
+from utils.buffer import InputBuffer
+
+
+def day_string(day: int) -> str:
+    """Format a day number the way the day folders are named."""
+    return str(day).zfill(2)
+
+
+def uses_buffer(module: ModuleType) -> bool:
+    """Check whether a solution wants an InputBuffer instead of a text file."""
+    return getattr(module, "INPUT_BUFFER", False)
+
+
+def open_input(module: ModuleType, input_file: Path) -> ContextManager[Any]:
+    """Open an input file in the form the solution expects."""
+    if uses_buffer(module):
+        return InputBuffer.open(input_file)
+    return open(input_file, "r", encoding="utf-8")
+
+
+def wrap_input(module: ModuleType, contents: bytes) -> InputBuffer | TextIO:
+    """Wrap input that is already in memory in the form the solution expects."""
+    if uses_buffer(module):
+        return InputBuffer(contents)
+    return io.StringIO(contents.decode("utf-8"))
+
+
+def solve(day: int, input_file: Path) -> tuple[list[Any], float]:
+    """Run both parts of a day's solution, returning the answers and the wall time."""
+    start = time.perf_counter()
+    day_str = day_string(day)
+    module = importlib.import_module(f"day{day_str}.day{day_str}")
+    with open_input(module, input_file) as fin:
+        iterator = module.run(fin)
+        answers = [next(iterator, None), next(iterator, None)]
+    return answers, time.perf_counter() - start
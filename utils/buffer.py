@@ -0,0 +1,77 @@
+"""Helpers for reading input as raw bytes."""
+from __future__ import annotations
+
+import mmap
+import os
+import warnings
+from pathlib import Path
+from types import TracebackType
+from typing import Iterator
+
+import numpy as np
+import numpy.typing as npt
+
+# The bulk decoders treat commas the same as whitespace
+SEPARATORS = bytes.maketrans(b",", b" ")
+
+
+class InputBuffer:
+    """An input file exposed as bytes, memory mapped when it is read from disk."""
+
+    def __init__(self, data: bytes | mmap.mmap) -> None:
+        self.data = data
+
+    @classmethod
+    def open(cls, path: Path) -> InputBuffer:
+        with open(path, "rb") as fin:
+            # Empty files can't be mapped
+            if os.fstat(fin.fileno()).st_size == 0:
+                return cls(b"")
+            return cls(mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def close(self) -> None:
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+
+    def __enter__(self) -> InputBuffer:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def read_lines(self) -> Iterator[str]:
+        """Read lines from the buffer, stripping newlines."""
+        start = 0
+        while start < len(self.data):
+            end = self.data.find(b"\n", start)
+            if end == -1:
+                end = len(self.data)
+            yield self.data[start:end].decode("utf-8").rstrip("\r")
+            start = end + 1
+
+    def ints(self) -> npt.NDArray[np.int64]:
+        """Read every integer in the buffer, separated by whitespace or commas.
+
+        Raises ValueError if the buffer holds anything else.
+        """
+        # fromstring only takes bytes, so a mapped file is copied once, and only
+        # copied again when there are commas to translate
+        data = self.data if isinstance(self.data, bytes) else self.data[:]
+        if b"," in data:
+            data = data.translate(SEPARATORS)
+        with warnings.catch_warnings():
+            # NumPy stops at the first token it can't parse and only warns
+            warnings.simplefilter("error", DeprecationWarning)
+            try:
+                return np.fromstring(data, dtype=np.int64, sep=" ")
+            except DeprecationWarning as e:
+                raise ValueError("Input buffer holds more than integers") from e
+
+    def int_columns(self, columns: int) -> npt.NDArray[np.int64]:
+        """Read rows of integers into an array with one column per value."""
+        return self.ints().reshape(-1, columns)
@@ -1,21 +1,41 @@
 """Helper functions for geometry."""
 from __future__ import annotations
 
-from collections.abc import Sequence
-from dataclasses import dataclass
-from typing import Iterator, TypeVar
+from collections.abc import Iterable, Sequence
+from typing import Iterator, NamedTuple, TypeVar
 
+_new_tuple = tuple.__new__
 
-@dataclass(frozen=True)
-class Point2D:
+
+# A NamedTuple rather than a dataclass so instances have no __dict__ and hash
+# and compare at C speed. Arithmetic builds the tuple directly, which skips
+# the generated __new__.
+class Point2D(NamedTuple):
     x: int
     y: int
 
-    def __add__(self, other: Point2D) -> Point2D:
-        return Point2D(self.x + other.x, self.y + other.y)
+    def __add__(self, other: Point2D) -> Point2D:  # type: ignore[override]
+        return _new_tuple(Point2D, (self[0] + other[0], self[1] + other[1]))
 
     def __sub__(self, other: Point2D) -> Point2D:
-        return Point2D(self.x - other.x, self.y - other.y)
+        return _new_tuple(Point2D, (self[0] - other[0], self[1] - other[1]))
+
+
+class PointInterner:
+    """Share a single Point2D per cell inside a width x height bounding box."""
+
+    def __init__(self, width: int, height: int) -> None:
+        self.width = width
+        self.height = height
+        self.points = [Point2D(x, y) for y in range(height) for x in range(width)]
+
+    def get(self, x: int, y: int) -> Point2D:
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.points[y * self.width + x]
+        return Point2D(x, y)
+
+    def add(self, point: Point2D, direction: Point2D) -> Point2D:
+        return self.get(point[0] + direction[0], point[1] + direction[1])
 
 
 UP = Point2D(0, -1)
@@ -32,10 +52,10 @@ CORNERS = [UP_LEFT, UP_RIGHT, DOWN_LEFT, DOWN_RIGHT]
 
 
 T = TypeVar("T")
-Grid = Sequence[Sequence[T]]
+NestedGrid = Sequence[Sequence[T]]
 
 
-def get_grid_point(grid: Grid[T], position: Point2D) -> T | None:
+def get_grid_point(grid: NestedGrid[T], position: Point2D) -> T | None:
     if (
         position.y < 0
         or position.y >= len(grid)
@@ -46,7 +66,81 @@ def get_grid_point(grid: Grid[T], position: Point2D) -> T | None:
     return grid[position.y][position.x]
 
 
-def iter_grid(grid: Grid[T]) -> Iterator[tuple[T, Point2D]]:
+def iter_grid(grid: NestedGrid[T]) -> Iterator[tuple[T, Point2D]]:
     for y, line in enumerate(grid):
         for x, val in enumerate(line):
             yield val, Point2D(x, y)
+
+
+class Grid:
+    """A character grid stored in one flat bytearray, indexed by y * stride + x.
+
+    The grid is surrounded by `padding` cells of `border`, so taking up to `padding`
+    steps in any direction from a cell never needs a bounds check.
+    """
+
+    def __init__(
+        self, rows: Iterable[str], padding: int = 1, border: str = " "
+    ) -> None:
+        lines = list(rows)
+        width = max((len(line) for line in lines), default=0)
+        self._set_layout(width, len(lines), padding, ord(border))
+
+        edge = border * padding
+        blank_rows = border * self.stride * padding
+        self.cells = bytearray(
+            (
+                blank_rows
+                + "".join(edge + line.ljust(width, border) + edge for line in lines)
+                + blank_rows
+            ).encode("ascii")
+        )
+
+    def _set_layout(self, width: int, height: int, padding: int, border: int) -> None:
+        self.width = width
+        self.height = height
+        self.padding = padding
+        self.stride = width + 2 * padding
+        self.border = border
+        # Integer deltas in the same order as the Point2D lists
+        self.compass = [self.offset(direction) for direction in COMPASS]
+        self.directions = [self.offset(direction) for direction in DIRECTIONS]
+        self.corners = [self.offset(direction) for direction in CORNERS]
+
+    def __getitem__(self, idx: int) -> str:
+        return chr(self.cells[idx])
+
+    def __setitem__(self, idx: int, value: str) -> None:
+        self.cells[idx] = ord(value)
+
+    def offset(self, direction: Point2D) -> int:
+        return direction.y * self.stride + direction.x
+
+    def index(self, position: Point2D) -> int:
+        return (position.y + self.padding) * self.stride + position.x + self.padding
+
+    def point(self, idx: int) -> Point2D:
+        y, x = divmod(idx, self.stride)
+        return Point2D(x - self.padding, y - self.padding)
+
+    def in_bounds(self, idx: int) -> bool:
+        return self.cells[idx] != self.border
+
+    def get(self, position: Point2D) -> str | None:
+        """Look up a cell by position, like get_grid_point."""
+        if not (0 <= position.x < self.width and 0 <= position.y < self.height):
+            return None
+        return chr(self.cells[self.index(position)])
+
+    def find(self, char: str) -> int:
+        """Find the index of the first cell holding char."""
+        return self.cells.index(ord(char))
+
+    def neighbours(self, idx: int) -> list[int]:
+        return [idx + offset for offset in self.compass]
+
+    def iter_cells(self) -> Iterator[tuple[str, int]]:
+        for y in range(self.height):
+            start = (y + self.padding) * self.stride + self.padding
+            for idx in range(start, start + self.width):
+                yield chr(self.cells[idx]), idx
@@ -10,9 +10,15 @@ def read_lines(file: TextIO) -> Iterator[str]:
         yield line.strip("\r\n")
 
 
+def iter_number_list(file: TextIO) -> Iterator[tuple[int, ...]]:
+    """Lazily read a list of numbers on each line of a file."""
+    for line in read_lines(file):
+        yield tuple([int(val) for val in line.split()])
+
+
 def read_number_list(file: TextIO) -> list[tuple[int, ...]]:
     """Read a list of numbers on each line of a file."""
-    return [tuple([int(val) for val in line.split()]) for line in read_lines(file)]
+    return list(iter_number_list(file))
 
 
 def read_number_columns(file: TextIO) -> list[tuple[int, ...]]:
@@ -20,16 +26,19 @@ def read_number_columns(file: TextIO) -> list[tuple[int, ...]]:
     return list(zip(*read_number_list(file)))
 
 
-def read_sections(file: TextIO) -> list[list[str]]:
-    """Read sections from a file."""
+def iter_sections(file: TextIO) -> Iterator[list[str]]:
+    """Lazily read blank line delimited sections from a file."""
     lines = read_lines(file)
-    results = []
     while True:
         section = list(takewhile(lambda s: s, lines))
         if not section:
             break
-        results.append(section)
-    return results
+        yield section
+
+
+def read_sections(file: TextIO) -> list[list[str]]:
+    """Read sections from a file."""
+    return list(iter_sections(file))
 
 
 def regex_groups(regex: re.Pattern[str], line: str) -> tuple[str, ...]:
@@ -0,0 +1,61 @@
+"""Helpers for sharing grids between processes without pickling them."""
+from __future__ import annotations
+
+from multiprocessing.shared_memory import SharedMemory
+from typing import NamedTuple
+
+from utils.geometry import Grid
+
+
+class SharedGridHandle(NamedTuple):
+    """Everything a worker needs to attach to a shared grid, cheap to pickle."""
+
+    name: str
+    width: int
+    height: int
+    padding: int
+    border: int
+
+
+class SharedGrid(Grid):
+    """A read-only Grid whose cells live in shared memory.
+
+    The process that creates it owns the memory and must unlink it once the workers
+    are done. Workers are expected to be child processes, which share the owner's
+    resource tracker, and attach through a handle.
+    """
+
+    cells: memoryview  # type: ignore[assignment]
+
+    def __init__(self, shm: SharedMemory, handle: SharedGridHandle) -> None:
+        self._set_layout(handle.width, handle.height, handle.padding, handle.border)
+        self.shm = shm
+        self.handle = handle
+        # The mapping can be rounded up to a whole page, so trim it to the grid
+        self._view = shm.buf[: (handle.height + 2 * handle.padding) * self.stride]
+        self.cells = self._view.toreadonly()
+
+    @classmethod
+    def create(cls, grid: Grid) -> SharedGrid:
+        shm = SharedMemory(create=True, size=len(grid.cells))
+        shm.buf[: len(grid.cells)] = grid.cells
+        handle = SharedGridHandle(
+            shm.name, grid.width, grid.height, grid.padding, grid.border
+        )
+        return cls(shm, handle)
+
+    @classmethod
+    def attach(cls, handle: SharedGridHandle) -> SharedGrid:
+        return cls(SharedMemory(name=handle.name), handle)
+
+    def find(self, char: str) -> int:
+        return bytes(self.cells).index(ord(char))
+
+    def close(self) -> None:
+        self.cells.release()
+        self._view.release()
+        self.shm.close()
+
+    def unlink(self) -> None:
+        self.close()
+        self.shm.unlink()
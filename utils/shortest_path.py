@@ -0,0 +1,112 @@
+"""Shortest path search over integer state ids."""
+from __future__ import annotations
+
+import sys
+from array import array
+from collections.abc import Callable, Iterable, Sequence
+from typing import NamedTuple
+
+UNREACHED = sys.maxsize
+
+
+class Move(NamedTuple):
+    """A step from state s to state s + delta, costing weight (which must be >= 1)."""
+
+    delta: int
+    weight: int
+
+
+class ShortestPaths:
+    """Distances from the sources to every reached state.
+
+    Bit m of previous[state] is set when taking moves[m] into state lies on a shortest
+    path, so every predecessor can be recovered as state - moves[m].delta.
+    """
+
+    def __init__(
+        self, moves: Sequence[Move], distances: array[int], previous: list[int]
+    ) -> None:
+        self.moves = moves
+        self.distances = distances
+        self.previous = previous
+
+    def nearest(self, targets: Iterable[int]) -> int | None:
+        """Find the distance to the closest of the targets, or None if none is reached."""
+        best = min((self.distances[target] for target in targets), default=UNREACHED)
+        return None if best == UNREACHED else best
+
+    def on_shortest_paths(self, targets: Iterable[int]) -> set[int]:
+        """Find every state on a shortest path to the closest of the targets."""
+        targets = list(targets)
+        best = self.nearest(targets)
+        if best is None:
+            raise ValueError("None of the targets were reached")
+        stack = [target for target in targets if self.distances[target] == best]
+        states = set(stack)
+        while stack:
+            state = stack.pop()
+            bits = self.previous[state]
+            while bits:
+                move = bits.bit_length() - 1
+                bits ^= 1 << move
+                prev = state - self.moves[move].delta
+                if prev not in states:
+                    states.add(prev)
+                    stack.append(prev)
+        return states
+
+
+def dijkstra(
+    state_count: int,
+    moves: Sequence[Move],
+    moves_from: Callable[[int], Iterable[int]],
+    sources: Iterable[int],
+    targets: Iterable[int] = (),
+) -> ShortestPaths:
+    """Dijkstra's algorithm with a bucket queue (Dial's algorithm).
+
+    States are ints in range(state_count) and moves_from(state) gives the indices of
+    the moves allowed from a state. Weights are small positive ints, so the queue is a
+    ring of max weight + 1 buckets, one per distance. The search stops once every
+    state as close as the nearest target has been expanded.
+    """
+    ring_size = max(move.weight for move in moves) + 1
+    buckets: list[list[int]] = [[] for _ in range(ring_size)]
+    distances = array("q", [UNREACHED]) * state_count
+    previous = [0] * state_count
+    is_target = bytearray(state_count)
+    for target in targets:
+        is_target[target] = 1
+
+    pending = 0
+    for source in sources:
+        distances[source] = 0
+        buckets[0].append(source)
+        pending += 1
+
+    best = UNREACHED
+    distance = 0
+    while pending and distance <= best:
+        bucket = buckets[distance % ring_size]
+        buckets[distance % ring_size] = []
+        pending -= len(bucket)
+        for state in bucket:
+            # Stale entry from before the state was reached more cheaply
+            if distances[state] != distance:
+                continue
+            if is_target[state]:
+                best = distance
+            for move in moves_from(state):
+                delta, weight = moves[move]
+                next_state = state + delta
+                next_distance = distance + weight
+                if next_distance < distances[next_state]:
+                    distances[next_state] = next_distance
+                    previous[next_state] = 1 << move
+                    buckets[next_distance % ring_size].append(next_state)
+                    pending += 1
+                elif next_distance == distances[next_state]:
+                    previous[next_state] |= 1 << move
+        distance += 1
+
+    return ShortestPaths(moves, distances, previous)
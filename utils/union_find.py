@@ -0,0 +1,44 @@
+"""Union-find over integer ids."""
+from __future__ import annotations
+
+from array import array
+
+
+class DisjointSets:
+    """Sets of the ids in range(count), each starting on its own.
+
+    Unions attach the smaller set under the larger one, and finds compress the path
+    they walk, so both take close to constant time.
+    """
+
+    def __init__(self, count: int) -> None:
+        self.parents = array("i", range(count))
+        self.sizes = array("i", [1]) * count
+
+    def find(self, idx: int) -> int:
+        parents = self.parents
+        root = idx
+        while parents[root] != root:
+            root = parents[root]
+        while parents[idx] != root:
+            parents[idx], idx = root, parents[idx]
+        return root
+
+    def union(self, a: int, b: int) -> tuple[int, int] | None:
+        """Merge the sets holding a and b.
+
+        Returns the surviving root and the root merged into it, or None if a and b were
+        already in the same set.
+        """
+        root_a = self.find(a)
+        root_b = self.find(b)
+        if root_a == root_b:
+            return None
+        if self.sizes[root_a] < self.sizes[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parents[root_b] = root_a
+        self.sizes[root_a] += self.sizes[root_b]
+        return root_a, root_b
+
+    def connected(self, a: int, b: int) -> bool:
+        return self.find(a) == self.find(b)